@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Send input.txt positions to analysis_server.py and print the answers.
+
+    python analysis_client.py input1.txt input2.txt --port 5610
+    python analysis_client.py --unix /tmp/checkers.sock --timeout 5
+
+Each answer is printed as the four lines of output.txt, after a "==> name
+<==" line when there is more than one input. Errors go to stderr.
+"""
+
+import argparse
+import socket
+import sys
+
+import analysis_server
+
+
+def connect(args):
+    if args.unix is not None:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(args.unix)
+    else:
+        connection = socket.create_connection((args.host, args.port))
+    return connection
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ask analysis_server.py for moves.')
+    parser.add_argument('inputs', nargs='*', default=['input.txt'],
+                        help='input.txt-style files (default: input.txt)')
+    parser.add_argument('--host', default='127.0.0.1', help='server address')
+    parser.add_argument('--port', type=int, default=5610, help='server TCP port')
+    parser.add_argument('--unix', metavar='PATH', help='server Unix socket')
+    parser.add_argument('--timeout', type=float, help='seconds the server may take per position')
+    args = parser.parse_args(argv)
+
+    connection = connect(args)
+    replies = connection.makefile('r')
+    failed = 0
+    try:
+        for path in args.inputs:
+            f = open(path, 'r')
+            lines = [line.rstrip() for line in f if line.strip()]
+            f.close()
+            request = ''
+            if args.timeout is not None:
+                request += 'timeout {}\n'.format(args.timeout)
+            request += '\n'.join(lines[:analysis_server.INPUT_LINES]) + '\n'
+            connection.sendall(request)
+
+            first = replies.readline()
+            if not first:
+                sys.stderr.write('{}: the server closed the connection\n'.format(path))
+                return 1
+            if len(args.inputs) > 1:
+                sys.stdout.write('==> {} <==\n'.format(path))
+            if first.startswith('error'):
+                failed += 1
+                sys.stderr.write('{}: {}'.format(path, first))
+                continue
+            sys.stdout.write(first)
+            for i in range(3):
+                sys.stdout.write(replies.readline())
+    finally:
+        replies.close()
+        connection.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Answer positions in the input.txt format over a local socket.
+
+    python analysis_server.py --port 5610 --jobs 4
+    python analysis_server.py --unix /tmp/checkers.sock --timeout 10
+    python analysis_client.py input6.txt --port 5610
+
+The engine runs in long-lived worker processes, so a request pays neither
+for starting Python nor for cold caches. Every worker remembers the
+answers it has given, which answers exact repeats of a request. With
+--tt-size a worker also keeps its transposition table from one request
+to the next, as long as they share a score_array, so that related
+positions, such as those of one game, find the bounds of earlier
+searches; the move and score are the same as with a fresh table, but
+node_counter shrinks. A request is the twelve lines of an input.txt file,
+optionally preceded by a line "timeout SECONDS". The answer is the four
+lines of output.txt, or a single line starting with "error". A connection
+may carry any number of requests, one after the other.
+
+A search that runs out of time, or whose client disconnects, is stopped
+by replacing its worker process with a fresh one.
+"""
+
+import argparse
+from collections import OrderedDict
+import multiprocessing
+import os
+import Queue
+import select
+import signal
+import socket
+import SocketServer
+import sys
+import time
+
+import hw1cs561s2018 as engine
+
+INPUT_LINES = 12
+
+
+class RequestTimeout(Exception):
+    """The answer was not ready in time."""
+
+
+class RequestCancelled(Exception):
+    """The client went away before the answer was ready."""
+
+
+class SolveError(Exception):
+    """The engine could not answer the request."""
+
+
+def _worker_loop(connection, options, memo_size):
+    """Answer the request texts sent over connection until it is closed."""
+    # Ctrl-C is for the server, which stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    memo = OrderedDict()
+    # The table values depend on the score_array: a new one starts over
+    tt = None
+    tt_score_array = None
+    while True:
+        try:
+            text = connection.recv()
+        except EOFError:
+            return
+        answer = memo.pop(text, None)
+        if answer is None:
+            try:
+                position = engine.read_input(text.splitlines(True))
+                if options.get('tt_size', 0) > 0 and position[4] != tt_score_array:
+                    tt = engine.TranspositionTable(options['tt_size'],
+                                                   legacy=options.get('tt_legacy', False))
+                    tt_score_array = position[4]
+                answer = engine.solve(*position, tt=tt, **options)
+            except Exception as error:
+                connection.send(('error', '{}: {}'.format(type(error).__name__, error)))
+                continue
+        memo[text] = answer
+        if len(memo) > memo_size:
+            memo.popitem(last=False)
+        connection.send(('ok', answer))
+
+
+class EngineWorker(object):
+    """A worker process with a pipe to send it requests over."""
+
+    def __init__(self, options, memo_size):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_loop,
+                                               args=(child, options, memo_size))
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+
+    def stop(self):
+        self.connection.close()
+        self.process.terminate()
+        self.process.join()
+
+
+class EnginePool(object):
+    """size EngineWorkers, each answering one request at a time."""
+
+    POLL_SECONDS = 0.05
+
+    def __init__(self, size, options, memo_size=4096):
+        self.options = options
+        self.memo_size = memo_size
+        self.idle = Queue.Queue()
+        for i in range(size):
+            self.idle.put(EngineWorker(options, memo_size))
+
+    def solve(self, text, timeout=None, cancelled=None):
+        """Answer the input.txt text in a worker. Raises RequestTimeout once
+        timeout seconds have passed (waiting for a free worker included),
+        and RequestCancelled as soon as cancelled() is true."""
+        deadline = time.time() + timeout if timeout is not None else None
+        try:
+            worker = self.idle.get(timeout=timeout)
+        except Queue.Empty:
+            raise RequestTimeout()
+        try:
+            worker.connection.send(text)
+            while not worker.connection.poll(self.POLL_SECONDS):
+                if cancelled is not None and cancelled():
+                    raise RequestCancelled()
+                if deadline is not None and time.time() > deadline:
+                    raise RequestTimeout()
+            status, result = worker.connection.recv()
+        except BaseException:
+            # The worker may still be searching: start over with a fresh one
+            worker.stop()
+            worker = EngineWorker(self.options, self.memo_size)
+            raise
+        finally:
+            self.idle.put(worker)
+        if status == 'error':
+            raise SolveError(result)
+        return result
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get().stop()
+
+
+def read_request(f):
+    """Read one request from f. Returns (text, timeout), or None once the
+    client has no more requests."""
+    timeout = None
+    lines = []
+    while len(lines) < INPUT_LINES:
+        line = f.readline()
+        if not line:
+            return None
+        if not line.strip():
+            continue
+        if not lines and line.startswith('timeout'):
+            fields = line.split()
+            if len(fields) != 2:
+                raise ValueError('expected "timeout SECONDS", got {!r}'.format(line.rstrip()))
+            timeout = float(fields[1])
+            continue
+        lines.append(line.rstrip() + '\n')
+    return ''.join(lines), timeout
+
+
+class AnalysisHandler(SocketServer.StreamRequestHandler):
+
+    # Unbuffered, so that a request pipelined behind the current one is still
+    # in the socket, where it tells a waiting client from a gone one
+    rbufsize = 0
+
+    def client_gone(self):
+        readable = select.select([self.connection], [], [], 0)[0]
+        try:
+            return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
+        except socket.error:
+            return True
+
+    def handle(self):
+        while True:
+            try:
+                request = read_request(self.rfile)
+            except ValueError as error:
+                self.wfile.write('error bad request: {}\n'.format(error))
+                return
+            if request is None:
+                return
+            text, timeout = request
+            if timeout is None:
+                timeout = self.server.timeout_seconds
+            try:
+                answer = self.server.pool.solve(text, timeout, self.client_gone)
+            except RequestCancelled:
+                return
+            except RequestTimeout:
+                self.wfile.write('error timeout after {}s\n'.format(timeout))
+            except SolveError as error:
+                self.wfile.write('error {}\n'.format(error))
+            else:
+                engine.write_output(self.wfile, answer)
+            self.wfile.flush()
+
+
+class AnalysisServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class UnixAnalysisServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Answer input.txt positions over a socket.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=5610, help='TCP port (default: %(default)s)')
+    parser.add_argument('--unix', metavar='PATH', help='listen on this Unix socket instead')
+    parser.add_argument('--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--timeout', type=float,
+                        help='seconds a request may take unless it sets its own')
+    parser.add_argument('--memo', type=int, default=4096,
+                        help='answers every worker remembers (default: %(default)s)')
+    engine.add_search_arguments(parser)
+    args = parser.parse_args(argv)
+
+    pool = EnginePool(max(1, args.jobs), engine.search_options(args), args.memo)
+    try:
+        if args.unix is not None:
+            if os.path.exists(args.unix):
+                os.remove(args.unix)
+            server = UnixAnalysisServer(args.unix, AnalysisHandler)
+            address = args.unix
+        else:
+            server = AnalysisServer((args.host, args.port), AnalysisHandler)
+            address = '{}:{}'.format(*server.server_address)
+        server.pool = pool
+        server.timeout_seconds = args.timeout
+        sys.stderr.write('serving on {} with {} workers\n'.format(address, max(1, args.jobs)))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if args.unix is not None:
+                os.remove(args.unix)
+    finally:
+        pool.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
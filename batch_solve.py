@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Solve many positions in the input.txt format in a pool of processes.
+
+    python batch_solve.py input*.txt --jsonl results.jsonl
+    python batch_solve.py positions/ --out-dir answers/
+    python batch_solve.py positions.bin --jsonl results.jsonl
+
+Directories stand for the input*.txt files inside them. A position file
+written by positions.py stands for all the positions in it, which are
+streamed to the workers as undecoded records. Answers go to one output
+file per input (input7.txt gives output7.txt, and position 3 of
+positions.bin, counting from 1, gives positions-3.out.txt) or to a JSONL
+stream, and the throughput is reported on stderr.
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import hw1cs561s2018 as engine
+
+
+def expand_inputs(patterns):
+    """Return the input files named by patterns (files, globs or directories)."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(glob.glob(os.path.join(pattern, 'input*.txt'))))
+        else:
+            matches = sorted(glob.glob(pattern))
+            paths.extend(matches if matches else [pattern])
+    return paths
+
+
+def position_count(path):
+    """The number of positions in the position file path, or None if it is
+    an input.txt file. Raises ValueError for a damaged position file."""
+    f = open(path, 'rb')
+    try:
+        if f.read(len(engine.PositionFile.MAGIC)) != engine.PositionFile.MAGIC:
+            return None
+        f.seek(0)
+        engine.PositionFile(f)
+        size = os.fstat(f.fileno()).st_size - engine.PositionFile.HEADER.size
+    finally:
+        f.close()
+    if size % engine.PositionFile.RECORD.size:
+        raise ValueError('{} ends in the middle of a record'.format(path))
+    return size // engine.PositionFile.RECORD.size
+
+
+def make_tasks(paths, options):
+    """Yield a (path, record number, record, options) task for every
+    position in paths, which position_count has checked. The record number
+    and record are None for an input.txt file, which the worker reads
+    itself."""
+    for path, count in paths:
+        if count is None:
+            yield path, None, None, options
+            continue
+        f = open(path, 'rb')
+        try:
+            for number, record in enumerate(engine.PositionFile(f).records(), 1):
+                yield path, number, record, options
+        finally:
+            f.close()
+
+
+def output_name(path, number=None):
+    name = os.path.basename(path)
+    if number is not None:
+        return '{}-{}.out.txt'.format(os.path.splitext(name)[0], number)
+    if name.startswith('input'):
+        return 'output' + name[len('input'):]
+    return os.path.splitext(name)[0] + '.out.txt'
+
+
+def solve_file(task):
+    """Solve the position of one task in a worker; returns (path, record
+    number, answer, error, seconds)."""
+    path, number, record, options = task
+    started = time.time()
+    try:
+        if record is None:
+            f = open(path, 'r')
+            position = engine.read_input(f)
+            f.close()
+        else:
+            position = engine.PositionFile.decode(record)
+        answer = engine.solve(*position, **options)
+    except Exception as error:
+        return (path, number, None, '{}: {}'.format(type(error).__name__, error),
+                time.time() - started)
+    return path, number, answer, None, time.time() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve many input.txt-style positions.')
+    parser.add_argument('inputs', nargs='+',
+                        help='input files, position files, globs or directories')
+    parser.add_argument('--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--out-dir', help='write one output file per input into this directory')
+    parser.add_argument('--chunk-size', type=int, default=16,
+                        help='positions handed to a worker at a time (default: %(default)s)')
+    parser.add_argument('--jsonl', default='-',
+                        help='JSONL file for the answers when --out-dir is not given '
+                             '(default: standard output)')
+    engine.add_search_arguments(parser)
+    args = parser.parse_args(argv)
+
+    paths = []
+    for path in expand_inputs(args.inputs):
+        try:
+            count = position_count(path)
+        except IOError:
+            # Reported as a failed position by the worker
+            count = None
+        except ValueError as error:
+            parser.error(str(error))
+        paths.append((path, count))
+    options = engine.search_options(args)
+    tasks = make_tasks(paths, options)
+
+    stream = None
+    if args.out_dir is None:
+        stream = sys.stdout if args.jsonl == '-' else open(args.jsonl, 'w')
+    elif not os.path.isdir(args.out_dir):
+        os.makedirs(args.out_dir)
+
+    started = time.time()
+    solved = failed = 0
+    pool = multiprocessing.Pool(max(1, args.jobs))
+    try:
+        for path, number, answer, error, seconds in pool.imap(solve_file, tasks,
+                                                              max(1, args.chunk_size)):
+            if error is not None:
+                failed += 1
+                sys.stderr.write('{}{}: {}\n'.format(
+                    path, '' if number is None else ' position {}'.format(number), error))
+                continue
+            solved += 1
+            if stream is None:
+                f = open(os.path.join(args.out_dir, output_name(path, number)), 'w')
+                engine.write_output(f, answer)
+                f.close()
+            else:
+                best_action, myopic_utility, best_score, node_counter = answer
+                result = {'input': path, 'move': best_action, 'myopic_utility': myopic_utility,
+                          'score': best_score, 'nodes': node_counter,
+                          'seconds': round(seconds, 6)}
+                if number is not None:
+                    result['position'] = number
+                stream.write(json.dumps(result) + '\n')
+                stream.flush()
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        if stream is not None and stream is not sys.stdout:
+            stream.close()
+
+    elapsed = time.time() - started
+    sys.stderr.write('solved {} positions ({} failed) in {:.2f}s: {:.1f} positions/s\n'.format(
+        solved, failed, elapsed, solved / elapsed if elapsed > 0 else 0.0))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
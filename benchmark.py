@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the searches over the bundled fixtures and generated positions.
+
+    python benchmark.py                    # compare with benchmark_baseline.json
+    python benchmark.py --update-baseline  # record a new baseline
+
+Each case runs in a fresh process (for its peak memory) and reports the
+best wall time of --repeat runs, node_counter, nodes per second and peak
+resident memory. The cases are:
+
+* every input*.txt fixture with its own algorithm and depth, checked
+  against the matching output*.txt,
+* MINIMAX, ALPHABETA, ALPHABETA with move ordering and PVS (which always
+  orders its moves) over the fixtures and --positions generated positions
+  at each of --depths,
+* move_generator and result timed on their own over the generated positions.
+
+The node counts of the algorithms are summed up by depth, and PVS is
+compared with both ALPHABETA searches, which it has to agree with. The generated
+positions are also solved at each depth with a transposition table and a
+--cache file shared by all of them, which has to give the same answers as
+solving them without.
+
+A run fails when an answer or node count differs from the baseline, when
+a case of at least --min-seconds is more than --threshold slower than in
+the baseline, or when a
+fixture answer differs from its output*.txt (unless the baseline lists
+that fixture under known_fixture_mismatches). Timings are only comparable
+on the machine the baseline was recorded on.
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import hw1cs561s2018 as engine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, 'benchmark_baseline.json')
+MICRO_CALLS = 20000
+# The searches compared: a name, the algorithm and the other solve keywords
+ALGORITHMS = (('MINIMAX', 'MINIMAX', {}),
+              ('ALPHABETA', 'ALPHABETA', {}),
+              ('ALPHABETA-ORDERED', 'ALPHABETA', {'order_moves': True}),
+              ('PVS', 'PVS', {}))
+
+
+def random_position(rng, algorithm='ALPHABETA', depth=4):
+    """A random position in the read_input format: single pieces anywhere
+    and stacks on the far rows, with increasing row weights."""
+    rows = [['0'] * 8 for i in range(8)]
+    stars, circles = rng.randint(2, 10), rng.randint(2, 10)
+    for index, square in enumerate(rng.sample(range(64), stars + circles)):
+        row, col = divmod(square, 8)
+        if index < stars:
+            rows[row][col] = 'S' + str(rng.randint(1, 3) if row == 0 else 1)
+        else:
+            rows[row][col] = 'C' + str(rng.randint(1, 3) if row == 7 else 1)
+    weights = [str(weight) for weight in sorted(rng.sample(range(1, 100), 8))]
+    return rng.choice(['Star', 'Circle']), algorithm, depth, rows, weights
+
+
+def read_fixture(path):
+    f = open(path, 'r')
+    position = engine.read_input(f)
+    f.close()
+    return position
+
+
+def read_answer(path):
+    f = open(path, 'r')
+    lines = [line.strip() for line in f if line.strip()]
+    f.close()
+    return lines
+
+
+def build_cases(depths, positions, seed):
+    cases = []
+    fixtures = sorted(glob.glob(os.path.join(HERE, 'input*.txt')))
+    generated = []
+    rng = random.Random(seed)
+    for index in range(positions):
+        generated.append(('generated{}'.format(index + 1), random_position(rng)))
+
+    for path in fixtures:
+        name = os.path.splitext(os.path.basename(path))[0]
+        expected = os.path.join(HERE, 'output' + name[len('input'):] + '.txt')
+        cases.append({'name': name, 'kind': 'fixture', 'position': read_fixture(path),
+                      'expected': os.path.basename(expected) if os.path.exists(expected) else None})
+    sources = [(os.path.splitext(os.path.basename(path))[0], read_fixture(path))
+               for path in fixtures] + generated
+    for depth in depths:
+        for search, algorithm, options in ALGORITHMS:
+            for name, position in sources:
+                position = position[:1] + (algorithm, depth) + position[3:]
+                cases.append({'name': '{}-{}-d{}'.format(name, search.lower(), depth),
+                              'kind': 'search', 'position': position, 'options': options,
+                              'source': name, 'search': search})
+    for function in ('move_generator', 'result'):
+        cases.append({'name': function, 'kind': function,
+                      'positions': [position for name, position in generated]})
+    return cases
+
+
+def time_micro(case):
+    """Call move_generator or result MICRO_CALLS times over the positions."""
+    game = engine.Checkers()
+    states = []
+    for next_to_move, algorithm, depth, rows, weights in case['positions']:
+        board = engine.Board.from_rows(rows)
+        states.append((engine.GameState(next_to_move, '0', board,
+                                        game.move_generator(board, next_to_move), None),
+                       weights))
+    calls = 0
+    started = time.time()
+    while calls < MICRO_CALLS:
+        for state, weights in states:
+            if case['kind'] == 'move_generator':
+                game.move_generator(state.board, state.to_move)
+                calls += 1
+            else:
+                for move in state.moves:
+                    game.result(state, move, weights, state.to_move)
+                    calls += 1
+    return time.time() - started, calls, None
+
+
+def time_search(case):
+    started = time.time()
+    answer = engine.solve(*case['position'], **case.get('options', {}))
+    return time.time() - started, answer[3], [str(value) for value in answer]
+
+
+def run_case(task):
+    """Run one case repeat times in this (fresh) process."""
+    case, repeat = task
+    best = None
+    for attempt in range(repeat):
+        if case['kind'] in ('move_generator', 'result'):
+            seconds, nodes, answer = time_micro(case)
+        else:
+            seconds, nodes, answer = time_search(case)
+        if best is None or seconds < best[0]:
+            best = (seconds, nodes, answer)
+    seconds, nodes, answer = best
+    return {'name': case['name'], 'seconds': seconds, 'nodes': nodes,
+            'nodes_per_second': nodes / seconds if seconds > 0 else 0.0,
+            # ru_maxrss is in kilobytes on Linux
+            'peak_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'answer': answer, 'expected': case.get('expected')}
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {'cases': {}, 'known_fixture_mismatches': []}
+    f = open(path, 'r')
+    baseline = json.load(f)
+    f.close()
+    return baseline
+
+
+def check(results, baseline, threshold, min_seconds):
+    """Return the list of problems with results."""
+    problems = []
+    known = set(baseline.get('known_fixture_mismatches', []))
+    for result in results:
+        name = result['name']
+        if result['expected'] and name + '.txt' not in known:
+            expected = read_answer(os.path.join(HERE, result['expected']))
+            if result['answer'] != expected:
+                problems.append('{}: answer {} but {} has {}'.format(
+                    name, result['answer'], result['expected'], expected))
+        recorded = baseline['cases'].get(name)
+        if recorded is None:
+            continue
+        if result['answer'] != recorded['answer']:
+            problems.append('{}: answer {} but the baseline has {}'.format(
+                name, result['answer'], recorded['answer']))
+        elif result['nodes'] != recorded['nodes']:
+            problems.append('{}: {} nodes but the baseline has {}'.format(
+                name, result['nodes'], recorded['nodes']))
+        if (recorded['seconds'] >= min_seconds and
+                result['seconds'] > recorded['seconds'] * (1 + threshold)):
+            problems.append('{}: {:.4f}s, {:.0%} slower than the baseline {:.4f}s'.format(
+                name, result['seconds'], result['seconds'] / recorded['seconds'] - 1,
+                recorded['seconds']))
+    return problems
+
+
+def compare_algorithms(cases, results):
+    """Return the lines summing up the node counts of the search cases by
+    depth and search, and the problems with ordered ALPHABETA and PVS
+    answers that differ from the ALPHABETA ones."""
+    by_name = dict((result['name'], result) for result in results)
+    totals = {}
+    answers = {}
+    for case in cases:
+        if case['kind'] != 'search':
+            continue
+        result = by_name[case['name']]
+        depth = case['position'][2]
+        search = case['search']
+        totals[depth, search] = totals.get((depth, search), 0) + result['nodes']
+        answers[case['source'], depth, search] = result['answer'][:3]
+    lines = []
+    for depth in sorted(set(depth for depth, search in totals)):
+        counts = [(search, totals[depth, search]) for search, algorithm, options in ALGORITHMS]
+        line = 'depth {}: '.format(depth) + ', '.join(
+            '{} {} nodes'.format(search, nodes) for search, nodes in counts)
+        against = []
+        for search in ('ALPHABETA-ORDERED', 'ALPHABETA'):
+            if totals[depth, search]:
+                against.append('{:+.1%} against {}'.format(
+                    float(totals[depth, 'PVS']) / totals[depth, search] - 1, search))
+        if against:
+            line += ' (PVS {})'.format(', '.join(against))
+        lines.append(line)
+    problems = []
+    for (source, depth, search), answer in sorted(answers.items()):
+        if (search in ('ALPHABETA-ORDERED', 'PVS') and
+                answer != answers[source, depth, 'ALPHABETA']):
+            problems.append('{} at depth {}: {} answers {} but ALPHABETA {}'.format(
+                source, depth, search, answer, answers[source, depth, 'ALPHABETA']))
+    return lines, problems
+
+
+def check_cache(positions, depths, tt_size=4096):
+    """Return the problems with the answers of positions solved with a
+    transposition table and a cache file seeded by the positions before
+    them, against solving them without."""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'positions.cache')
+    problems = []
+    try:
+        for depth in depths:
+            for name, position in positions:
+                position = position[:1] + ('ALPHABETA', depth) + position[3:]
+                plain = engine.solve(*position)
+                cached = engine.solve(*position, tt_size=tt_size, cache_path=path)
+                if plain[:3] != cached[:3]:
+                    problems.append('{} at depth {}: answers {} with a seeded cache but {} '
+                                    'without'.format(name, depth, list(cached[:3]),
+                                                     list(plain[:3])))
+    finally:
+        shutil.rmtree(directory)
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the checkers searches.')
+    parser.add_argument('--depths', type=int, nargs='+', default=[2, 4],
+                        help='depths for the MINIMAX/ALPHABETA/PVS cases (default: 2 4)')
+    parser.add_argument('--positions', type=int, default=5,
+                        help='generated positions (default: 5)')
+    parser.add_argument('--seed', type=int, default=561, help='seed for the generated positions')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per case; the fastest one counts (default: 3)')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown against the baseline (default: 0.2 = 20%%)')
+    parser.add_argument('--min-seconds', type=float, default=0.01,
+                        help='only check the timing of cases that took at least this long '
+                             'in the baseline (default: 0.01)')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='record these results as the new baseline')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.depths, args.positions, args.seed)
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    try:
+        results = []
+        for result in pool.imap(run_case, [(case, args.repeat) for case in cases]):
+            results.append(result)
+            sys.stdout.write('{:<32} {:>10.4f}s {:>10} nodes {:>12.0f} nodes/s {:>8} KB\n'.format(
+                result['name'], result['seconds'], result['nodes'],
+                result['nodes_per_second'], result['peak_kb']))
+            sys.stdout.flush()
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    if args.json:
+        f = open(args.json, 'w')
+        json.dump(results, f, indent=2, sort_keys=True, separators=(',', ': '))
+        f.close()
+
+    summary, disagreements = compare_algorithms(cases, results)
+    for line in summary:
+        sys.stdout.write(line + '\n')
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        baseline['cases'] = dict((result['name'], {'seconds': result['seconds'],
+                                                   'nodes': result['nodes'],
+                                                   'answer': result['answer']})
+                                 for result in results)
+        f = open(args.baseline, 'w')
+        json.dump(baseline, f, indent=2, sort_keys=True, separators=(',', ': '))
+        f.write('\n')
+        f.close()
+        sys.stdout.write('baseline written to {}\n'.format(args.baseline))
+        return 0
+
+    generated = [case['positions'] for case in cases if case['kind'] == 'result'][0]
+    generated = [('generated{}'.format(index + 1), position)
+                 for index, position in enumerate(generated)]
+    problems = (disagreements + check_cache(generated, args.depths) +
+                check(results, baseline, args.threshold, args.min_seconds))
+    for problem in problems:
+        sys.stdout.write('FAIL ' + problem + '\n')
+    sys.stdout.write('{} cases, {} problems\n'.format(len(results), len(problems)))
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,12 +5,87 @@ Spyder Editor
 Assignment 1
 """
 
-from collections import namedtuple
-import copy
+import argparse
+from array import array
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+import hashlib
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # PositionCache files are then not locked
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # batch_utility then scores the boards one at a time
 
 
 infinity = float('inf')
-GameState = namedtuple('GameState', 'to_move, utility, board, moves,prev_move')
+
+
+class GameState(object):
+    """A position and the side to move.
+
+    prev_move is the move that led to the position (None at the root) and
+    passes the number of passes in a row that ended with it, which is all
+    the history the game needs: two passes and a third forced one end it.
+
+    moves and utility can be passed in, or left to be computed on first
+    access (and then cached) through game.move_generator and
+    game.compute_utility for player and score_array. A lazy state whose
+    board is shared by a search must be read while the search is at it."""
+
+    __slots__ = ('to_move', 'board', 'prev_move', 'passes', '_utility', '_moves',
+                 '_game', '_player', '_score_array')
+
+    def __init__(self, to_move, utility=None, board=None, moves=None, prev_move=None,
+                 game=None, player=None, score_array=None, passes=0):
+        self.to_move = to_move
+        self.board = board
+        self.prev_move = prev_move
+        self.passes = passes
+        self._utility = utility
+        self._moves = moves
+        self._game = game
+        self._player = player
+        self._score_array = score_array
+
+    @property
+    def moves(self):
+        if self._moves is None:
+            self._moves = self._game.move_generator(self.board, self.to_move)
+        return self._moves
+
+    @property
+    def utility(self):
+        if self._utility is None:
+            self._utility = self._game.compute_utility(self.board, self._player,
+                                                       self._score_array)
+        return self._utility
+
+    def _replace(self, **changes):
+        """Copy of the state with some fields changed, like namedtuple._replace.
+        Values already computed are kept."""
+        fields = dict(to_move=self.to_move, utility=self._utility, board=self.board,
+                      moves=self._moves, prev_move=self.prev_move, game=self._game,
+                      player=self._player, score_array=self._score_array, passes=self.passes)
+        fields.update(changes)
+        return GameState(**fields)
+
+    def __repr__(self):
+        return 'GameState(to_move={!r}, board={!r}, prev_move={!r}, passes={!r})'.format(
+            self.to_move, self.board, self.prev_move, self.passes)
+
 
 class Game:
     
@@ -43,9 +118,235 @@ class Game:
 
 
 
+BOARD_SIZE = 8
+TOP_ROW = 0xFF
+BOTTOM_ROW = 0xFF << 56
+
+
+def square_index(row, col):
+    return row * BOARD_SIZE + col
+
+
+def _move_tables():
+    """MOVE_TABLES[side][square] lists, for each forward direction of a
+    piece of side on square that stays on the board, the bit of the square
+    stepped to or jumped over, the step move, the bit of the square a jump
+    lands on and the jump move. The landing bit is 0 (and the jump move
+    None) when a jump would leave the board."""
+    tables = {}
+    for side, row_step in (('Star', -1), ('Circle', 1)):
+        squares = []
+        for square in range(BOARD_SIZE * BOARD_SIZE):
+            piece = divmod(square, BOARD_SIZE)
+            directions = []
+            for col_step in (-1, 1):
+                target = (piece[0] + row_step, piece[1] + col_step)
+                if not (0 <= target[0] < BOARD_SIZE and 0 <= target[1] < BOARD_SIZE):
+                    continue
+                landing = (target[0] + row_step, target[1] + col_step)
+                if 0 <= landing[0] < BOARD_SIZE and 0 <= landing[1] < BOARD_SIZE:
+                    landing_bit, jump = 1 << square_index(*landing), (piece, landing)
+                else:
+                    landing_bit, jump = 0, None
+                directions.append((1 << square_index(*target), (piece, target), landing_bit, jump))
+            squares.append(tuple(directions))
+        tables[side] = tuple(squares)
+    return tables
+
+MOVE_TABLES = _move_tables()
+
+
+def _zobrist_keys(seed=561):
+    # 63-bit keys stay plain ints on 64-bit Python 2, which XOR faster than longs
+    rng = random.Random(seed)
+    square_keys = []
+    for square in range(BOARD_SIZE * BOARD_SIZE):
+        keys = [rng.getrandbits(63) for i in range(256)]
+        keys[0] = 0  # an empty square adds nothing to the hash
+        square_keys.append(keys)
+    star_to_move, passed, star_player = [rng.getrandbits(63) for i in range(3)]
+    return square_keys, star_to_move, (0, passed, rng.getrandbits(63)), star_player
+
+# ZOBRIST_SQUARE[square][count] is indexed with the signed stack count, so the
+# Circle stacks (negative counts) take their keys from the back of each row.
+# ZOBRIST_PASSES[passes] is indexed with the passes in a row, up to two
+ZOBRIST_SQUARE, ZOBRIST_STAR_TO_MOVE, ZOBRIST_PASSES, ZOBRIST_STAR_PLAYER = _zobrist_keys()
+
+
+Weights = namedtuple('Weights', 'score_array, star, circle')
+
+_weights_cache = {}
+
+
+def parse_weights(score_array):
+    """Return the Weights of score_array: the worth of one Star and of one
+    Circle piece on every square (Stars score by score_array reversed).
+    Each distinct score_array is parsed only once."""
+    cache_key = tuple(score_array)
+    weights = _weights_cache.get(cache_key)
+    if weights is None:
+        row_weights = [int(weight) for weight in score_array]
+        weights = Weights(score_array,
+                          [row_weights[7 - (square >> 3)] for square in range(64)],
+                          [row_weights[square >> 3] for square in range(64)])
+        _weights_cache[cache_key] = weights
+    return weights
+
+
+class Board(object):
+    """Checkers position kept as integer bitboards.
+
+    Bit ``row*8+col`` of ``star``/``circle`` is set when that side occupies
+    the square, and ``counts`` holds the stack height of every square
+    (positive for Star, negative for Circle). ``zobrist`` is the Zobrist
+    hash of the pieces, kept up to date by Checkers.apply_move.
+
+    After set_score_array, ``score`` is the Star utility (Star minus Circle)
+    under ``weights``, also kept up to date by Checkers.apply_move."""
+
+    __slots__ = ('star', 'circle', 'counts', 'zobrist', 'weights', 'score')
+
+    def __init__(self, star=0, circle=0, counts=None, zobrist=0, weights=None, score=0):
+        self.star = star
+        self.circle = circle
+        self.counts = counts if counts is not None else array('b', [0] * 64)
+        self.zobrist = zobrist
+        self.weights = weights
+        self.score = score
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a board from the 'S4'/'C1'/'0' rows of input.txt."""
+        counts = [0] * 64
+        for row_index, row in enumerate(rows):
+            for col_index, item in enumerate(row):
+                square = square_index(row_index, col_index)
+                if item.find("S") != -1:
+                    times = int(filter(str.isdigit, item))
+                    if times > 0:
+                        counts[square] = times
+                if item.find("C") != -1:
+                    times = int(filter(str.isdigit, item))
+                    if times > 0:
+                        counts[square] = -times
+        return cls.from_counts(counts)
+
+    @classmethod
+    def from_counts(cls, counts):
+        """Build a board from the signed stack counts of its 64 squares."""
+        board = cls(counts=array('b', counts))
+        for square, count in enumerate(board.counts):
+            if count > 0:
+                board.star |= 1 << square
+            elif count < 0:
+                board.circle |= 1 << square
+            board.zobrist ^= ZOBRIST_SQUARE[square][count]
+        return board
+
+    def to_rows(self):
+        """Return the board in the 'S4'/'C1'/'0' row format of input.txt."""
+        rows = []
+        for row_index in range(BOARD_SIZE):
+            row = []
+            for col_index in range(BOARD_SIZE):
+                count = self.counts[square_index(row_index, col_index)]
+                if count > 0:
+                    row.append('S' + str(count))
+                elif count < 0:
+                    row.append('C' + str(-count))
+                else:
+                    row.append('0')
+            rows.append(row)
+        return rows
+
+    def copy(self):
+        return Board(self.star, self.circle, self.counts[:], self.zobrist,
+                     self.weights, self.score)
+
+    def set_score_array(self, score_array):
+        """Track the utility of the board under score_array from now on."""
+        self.weights = parse_weights(score_array)
+        self.score = self.score_under(self.weights)
+
+    def score_under(self, weights):
+        """Star utility of the board under weights, counted square by square."""
+        score = 0
+        for square, count in enumerate(self.counts):
+            if count > 0:
+                score += count * weights.star[square]
+            elif count < 0:
+                score += count * weights.circle[square]
+        return score
+
+    def __eq__(self, other):
+        return (isinstance(other, Board) and self.star == other.star and
+                self.circle == other.circle and self.counts == other.counts)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Board({})'.format(self.to_rows())
+
+
+def stack_boards(boards):
+    """Return the (N, 8, 8) stack counts of the Star and of the Circle
+    pieces of boards (Boards, or the counts arrays of Boards), as taken by
+    batch_utility. Without NumPy they are nested lists."""
+    counts = [board.counts if isinstance(board, Board) else board for board in boards]
+    if numpy is None:
+        star = [[[max(count[row * BOARD_SIZE + col], 0) for col in range(BOARD_SIZE)]
+                 for row in range(BOARD_SIZE)] for count in counts]
+        circle = [[[max(-count[row * BOARD_SIZE + col], 0) for col in range(BOARD_SIZE)]
+                   for row in range(BOARD_SIZE)] for count in counts]
+        return star, circle
+    signed = numpy.frombuffer(b''.join(count.tostring() for count in counts),
+                              dtype=numpy.int8).reshape(-1, BOARD_SIZE, BOARD_SIZE)
+    return numpy.maximum(signed, 0), numpy.maximum(-signed, 0)
+
+
+def batch_utility(star, circle, player, score_array):
+    """Utilities for player of N boards given as (N, 8, 8) stack counts of
+    the Star and of the Circle pieces, as Checkers.utility would score them
+    one by one. With NumPy all N are scored in one vectorized computation.
+    Returns a list of ints."""
+    row_weights = [int(weight) for weight in score_array]
+    if numpy is None:
+        scores = [sum(sum(row) * row_weights[7 - index] for index, row in enumerate(star_rows)) -
+                  sum(sum(row) * row_weights[index] for index, row in enumerate(circle_rows))
+                  for star_rows, circle_rows in zip(star, circle)]
+    else:
+        row_weights = numpy.array(row_weights, dtype=numpy.int64)
+        scores = (numpy.asarray(star, dtype=numpy.int64).sum(axis=2).dot(row_weights[::-1]) -
+                  numpy.asarray(circle, dtype=numpy.int64).sum(axis=2).dot(row_weights)).tolist()
+    if player == 'Star':
+        return scores
+    return [-score for score in scores]
+
+
+def child_utilities(game, state, actions, player, score_array):
+    """Utilities for player of the positions actions lead to from state,
+    scored together with batch_utility. The moves are made on state.board
+    and taken back."""
+    board = state.board
+    children = []
+    for a in actions:
+        undo = game.apply_move(board, a, state.to_move)
+        children.append(board.counts[:])
+        game.undo_move(board, undo)
+    star, circle = stack_boards(children)
+    return batch_utility(star, circle, player, score_array)
+
+
 class Checkers(Game):
-    
-    move_history = []
+    """The game as the assignment plays it. Every piece of a stack moves on
+    its own, so a stack of four gives each of its moves four times (and
+    the searches count every copy), unless distinct_moves is set: then
+    each move is generated once. The moves are the same either way, and
+    so are the best move and score; only node_counter changes."""
+
+    def __init__(self, distinct_moves=False):
+        self.distinct_moves = distinct_moves
 
     def actions(self, state):
         return state.moves
@@ -53,53 +354,38 @@ class Checkers(Game):
     def result(self, state, move,score_array,player):
         if move not in state.moves:
             return state  # Illegal move has no effect
-        elif move == 'pass':
-            board_current =copy.deepcopy(state.board)
-            star_list,circle_list = self.list_generator(board_current)
-            return GameState(to_move=('Star' if state.to_move == 'Circle' else 'Circle'),
-                         utility=self.compute_utility(board_current, player,score_array),
-                         board=board_current, moves=self.move_generator(board_current,
-                                                                    ('Star' if state.to_move == 'Circle'
-                                                                     else 'Circle'),
-                                                                     star_list,circle_list),
-                                                                     prev_move = self.last_move())
-        else:
-            board_current = copy.deepcopy(state.board)
-            new_board = self.update_board(board_current,move,state.to_move)
-            star_list,circle_list = self.list_generator(new_board)
-            return GameState(to_move=('Star' if state.to_move == 'Circle' else 'Circle'),
-                         utility=self.compute_utility(new_board, player,score_array),
-                         board=new_board, moves=self.move_generator(new_board,
-                                                                    ('Star' if state.to_move == 'Circle'
-                                                                     else 'Circle'),
-                                                                     star_list,circle_list),
-                                                                     prev_move = self.last_move())
+        board_current = state.board.copy()
+        self.apply_move(board_current, move, state.to_move)
+        return self.next_state(state, move, board_current, score_array, player)
+
+    def next_state(self, state, move, board, score_array, player):
+        """Return the state after state.to_move has played move, given the
+        board that move produced. The board is not copied, and the moves and
+        utility of the state are only worked out when first asked for."""
+        next_to_move = 'Star' if state.to_move == 'Circle' else 'Circle'
+        return GameState(to_move=next_to_move, board=board,
+                         prev_move = move,
+                         game=self, player=player, score_array=score_array,
+                         passes=state.passes + 1 if move == 'pass' else 0)
 
     def utility(self, state, player,score_array):
-        board = copy.deepcopy(state.board)
-        return self.compute_utility(board, player,score_array)
+        return self.compute_utility(state.board, player,score_array)
 
     def terminal_test(self, state,player):
         """CASE 1: NO STAR OR CIRCLE REMAINING"""
         
-        star_list,circle_list = self.list_generator(state.board)
-        
-        if len(star_list) == 0 or len(circle_list) == 0:
+        if not state.board.star or not state.board.circle:
             return True
         
         """CASE 2: Consecutive pass"""
-        if state.moves[0] == state.prev_move and state.prev_move == 'pass' and self.move_history[-1] == 'pass':
+        # state.moves is checked last so it is only generated after two passes
+        if state.passes >= 2 and state.moves[0] == 'pass':
             return True
         
         return False     
 
     def display(self, state):
-        board = copy.deepcopy(state.board)
-        #for x in range(0, 8):
-        #    for y in range(0, 8):
-        #        print(board[x][y] + "."),
-        #    print
-        s = [[str(e) for e in row] for row in board]
+        s = state.board.to_rows()
         lens = [max(map(len, col)) for col in zip(*s)]
         fmt = '\t'.join('{{:{}}}'.format(x) for x in lens)
         table = [fmt.format(*row) for row in s]
@@ -109,186 +395,121 @@ class Checkers(Game):
 
     def compute_utility(self, board, player,score_array):
         
-        score_array_rev = score_array[::-1]
-        
-        star_list,circle_list = self.list_generator(board)
-        
-        current_player_utility = 0
-        opposite_player_utility = 0
-        if player == 'Star':
-            for star in star_list:
-                current_player_utility += int(score_array_rev[star[0]]) 
-            for circle in circle_list:
-                opposite_player_utility += int(score_array[circle[0]])
-                
-            total_utility = current_player_utility - opposite_player_utility
-            
+        # Boards tracking this score_array already know their score
+        weights = board.weights
+        if weights is not None and (weights.score_array is score_array or
+                                    weights.score_array == score_array):
+            score = board.score
         else:
-            for circle in circle_list:
-                current_player_utility += int(score_array[circle[0]]) 
-            for star in star_list:
-                opposite_player_utility += int(score_array_rev[star[0]])
-                
-            total_utility = current_player_utility - opposite_player_utility
+            score = board.score_under(parse_weights(score_array))
             
-            
-        return total_utility
+        if player == 'Star':
+            return score
+        return -score
         
         
     def update_board(self,cur_board,move,player):
         
+        cur_board = cur_board.copy()
+        self.apply_move(cur_board, move, player)
+        return cur_board
+
+    def apply_move(self, board, move, player):
+        """Play move for player on board in place.
+
+        Returns the record undo_move needs to take the move back."""
+        if move == 'pass':
+            return None
         
-        cur_board = copy.deepcopy(cur_board)
+        counts = board.counts
+        source = square_index(*move[0])
+        destination = square_index(*move[1])
+        jumped = (source + destination) >> 1 if abs(move[0][0] - move[1][0]) == 2 else None
+        undo = (board.star, board.circle, board.zobrist, board.score, source, counts[source],
+                destination, counts[destination],
+                jumped, counts[jumped] if jumped is not None else 0)
+        zobrist = (board.zobrist ^ ZOBRIST_SQUARE[source][counts[source]] ^
+                   ZOBRIST_SQUARE[destination][counts[destination]])
+        weights = board.weights
         
+        # The whole source square is emptied and the destination stack grows by one
         if player == 'Star':
-            source = move[0]
-            destination = move[1]
-            
-            #Handle non jump case
-            
-            if source[0] - destination[0] == 1:
-                if cur_board[destination[0]][destination[1]] == '0':
-                    cur_board[destination[0]][destination[1]] = 'S1'
-                    cur_board[source[0]][source[1]] = '0'
-                else:
-                    current_string = cur_board[destination[0]][destination[1]]
-                    times = int(filter(str.isdigit, current_string))
-                    times = times + 1
-                    cur_board[destination[0]][destination[1]] = 'S'+str(times)
-                    cur_board[source[0]][source[1]] = '0'
-                    
-            else:
-                if cur_board[destination[0]][destination[1]] == '0':
-                    cur_board[destination[0]][destination[1]] = 'S1'
-                    cur_board[source[0]][source[1]] = '0'
-                    
-                    
-                else:
-                    current_string = cur_board[destination[0]][destination[1]]
-                    times = int(filter(str.isdigit, current_string))
-                    times = times + 1
-                    cur_board[destination[0]][destination[1]] = 'S'+str(times)
-                    cur_board[source[0]][source[1]] = '0'
-                  
-                #kill the piecw
-                if source[1] - destination[1] > 0:
-                    cur_board[source[0]-1][source[1]-1] = '0'
-                else:
-                    cur_board[source[0]-1][source[1]+1] = '0'
-                    
+            if weights is not None:
+                board.score += weights.star[destination] - counts[source] * weights.star[source]
+            counts[destination] += 1
+            board.star = (board.star & ~(1 << source)) | (1 << destination)
         else:
-            source = move[0]
-            destination = move[1]
-            
-            #Handle non jump case
-            
-            if source[0] - destination[0] == -1:
-                if cur_board[destination[0]][destination[1]] == '0':
-                    cur_board[destination[0]][destination[1]] = 'C1'
-                    cur_board[source[0]][source[1]] = '0'
-                else:
-                    current_string = cur_board[destination[0]][destination[1]]
-                    times = int(filter(str.isdigit, current_string))
-                    times = times + 1
-                    cur_board[destination[0]][destination[1]] = 'C'+str(times)
-                    cur_board[source[0]][source[1]] = '0'
-                    
-            else:
-                if cur_board[destination[0]][destination[1]] == '0':
-                    cur_board[destination[0]][destination[1]] = 'C1'
-                    cur_board[source[0]][source[1]] = '0'
-                    
-                    
-                else:
-                    current_string = cur_board[destination[0]][destination[1]]
-                    times = int(filter(str.isdigit, current_string))
-                    times = times + 1
-                    cur_board[destination[0]][destination[1]] = 'C'+str(times)
-                    cur_board[source[0]][source[1]] = '0'
-                  
-                #kill the piecw
-                if source[1] - destination[1] > 0:
-                    cur_board[source[0]+1][source[1]-1] = '0'
-                else:
-                    cur_board[source[0]+1][source[1]+1] = '0'
-                    
-                    
-        return cur_board
+            if weights is not None:
+                board.score -= weights.circle[destination] + counts[source] * weights.circle[source]
+            counts[destination] -= 1
+            board.circle = (board.circle & ~(1 << source)) | (1 << destination)
+        counts[source] = 0
+        zobrist ^= ZOBRIST_SQUARE[destination][counts[destination]]
+        
+        #kill the jumped piece
+        if jumped is not None:
+            zobrist ^= ZOBRIST_SQUARE[jumped][counts[jumped]]
+            if weights is not None:
+                jumped_count = counts[jumped]
+                board.score -= jumped_count * (weights.star[jumped] if jumped_count > 0
+                                               else weights.circle[jumped])
+            counts[jumped] = 0
+            board.star &= ~(1 << jumped)
+            board.circle &= ~(1 << jumped)
+        
+        board.zobrist = zobrist
+        return undo
+
+    def undo_move(self, board, undo):
+        """Take back the move apply_move returned undo for."""
+        if undo is None:
+            return
+        (star, circle, zobrist, score, source, source_count,
+         destination, destination_count, jumped, jumped_count) = undo
+        board.star = star
+        board.circle = circle
+        board.zobrist = zobrist
+        board.score = score
+        counts = board.counts
+        counts[source] = source_count
+        counts[destination] = destination_count
+        if jumped is not None:
+            counts[jumped] = jumped_count
                     
                         
-    def move_generator(self,board,next_to_move,star_list,circle_list):
+    def move_generator(self,board,next_to_move):
         
         """ This function generates list of valid moves"""
         moves = []
-        # Regular move
+        # Pieces on the far row no longer move, and the own pieces there do not
+        # block: further pieces landing on them are stacked
         if next_to_move == 'Star':
-            #remove the pieces on the top row
-            star_list_temp = [i for i in star_list if i[0] > 0]
-            pos_moves = [(-1,-1),(-1,1)]
-            for piece in star_list_temp:
-                for pos in pos_moves:
-                    targetx = piece[0] + pos[0]
-                    targety = piece[1] + pos[1]
-                    if targetx < 0 or targetx > 7 or targety < 0 or targety > 7:
-                        continue
-                    target = (targetx, targety)
-                    # Check that there is nothing in the way of moving to the target
-                    circle = target in circle_list
-                    star = target in star_list_temp
-                    if not circle and not star:
-                        moves.append((piece,target))
-                        # There was something in the way, can we jump it?
-                    else:
-                        # It has to be of the opposing color to jump
-                        if  star:
-                            continue
-                        # Jump proceeds by adding the same movement in order to jump over the opposing 
-                        # piece on the checkerboard
-                        jumpx = target[0] + pos[0] 
-                        jumpy = target[1] + pos[1]
-                        # If the jump is going to be out of bounds don't do it.
-                        if jumpx < 0 or jumpx > 7 or jumpy < 0 or jumpy > 7:
-                            continue
-                        jump = (jumpx, jumpy)
-                        # Check that there is nothing in the jumpzone
-                        circle = jump in circle_list
-                        star = jump in star_list_temp
-                        if not star and not circle:
-                            moves.append((piece,jump))
-                            
-        if next_to_move == 'Circle':
-            circle_list_temp = [i for i in circle_list if i[0] < 7]
-            pos_moves = [(1,-1),(1,1)]
-            for piece in circle_list_temp:
-                for pos in pos_moves:
-                    targetx = piece[0] + pos[0]
-                    targety = piece[1] + pos[1]
-                    if targetx < 0 or targetx > 7 or targety < 0 or targety > 7:
-                        continue
-                    target = (targetx, targety)
-                    # Check that there is nothing in the way of moving to the target
-                    circle = target in circle_list_temp
-                    star = target in star_list
-                    if not circle and not star:
-                        moves.append((piece,target))
-                        # There was something in the way, can we jump it?
-                    else:
-                        # It has to be of the opposing color to jump
-                        if  circle:
-                            continue
-                        # Jump proceeds by adding the same movement in order to jump over the opposing 
-                        # piece on the checkerboard
-                        jumpx = target[0] + pos[0] 
-                        jumpy = target[1] + pos[1]
-                        # If the jump is going to be out of bounds don't do it.
-                        if jumpx < 0 or jumpx > 7 or jumpy < 0 or jumpy > 7:
-                            continue
-                        jump = (jumpx, jumpy)
-                        # Check that there is nothing in the jumpzone
-                        circle = jump in circle_list_temp
-                        star = jump in star_list
-                        if not star and not circle:
-                            moves.append((piece,jump))
+            movers = board.star & ~TOP_ROW
+            opponent = board.circle
+        else:
+            movers = board.circle & ~BOTTOM_ROW
+            opponent = board.star
+        occupied = movers | opponent
+        counts = board.counts
+        table = MOVE_TABLES[next_to_move]
+        distinct = self.distinct_moves
+        
+        while movers:
+            low = movers & -movers
+            square = low.bit_length() - 1
+            movers ^= low
+            piece_moves = []
+            for target_bit, step, landing_bit, jump in table[square]:
+                # Check that there is nothing in the way of moving to the target
+                if not occupied & target_bit:
+                    piece_moves.append(step)
+                # It has to be of the opposing color to jump, and the jump
+                # has to stay on the board and land on an empty square
+                elif opponent & target_bit and landing_bit and not occupied & landing_bit:
+                    piece_moves.append(jump)
+            # Every piece of a stack is expanded on its own
+            if piece_moves:
+                moves.extend(piece_moves if distinct else piece_moves * abs(counts[square]))
                             
         if len(moves) == 0:
             moves.append('pass')
@@ -301,217 +522,1481 @@ class Checkers(Game):
         star_list = []
         circle_list = []
         
-        for row_index, row in enumerate(board):
-            for col_index, item in enumerate(row):
-                if item.find("S") != -1:
-                    times = int(filter(str.isdigit, item))
-                    for i in range(0,times):
-                        star_list.append((row_index,col_index))
-                if item.find("C") != -1:
-                    times = int(filter(str.isdigit, item))
-                    for i in range(0,times):
-                        circle_list.append((row_index,col_index))
-            
+        for square, count in enumerate(board.counts):
+            if count > 0:
+                star_list.extend([divmod(square, BOARD_SIZE)] * count)
+            elif count < 0:
+                circle_list.extend([divmod(square, BOARD_SIZE)] * -count)
                 
         return star_list,circle_list
     
-    def update_history(self,move,):
-        
-        self.move_history.append(move)
-       
-    
-    def last_move(self):
-          
-        if len(self.move_history) >= 2:
-            return self.move_history[-2]
+    def position_key(self, state, player):
+        """Zobrist key of state in a search for player. The passes that led
+        to state are part of it, as two in a row can end the game."""
+        key = state.board.zobrist
+        if state.to_move == 'Star':
+            key ^= ZOBRIST_STAR_TO_MOVE
+        if player == 'Star':
+            key ^= ZOBRIST_STAR_PLAYER
+        return key ^ ZOBRIST_PASSES[min(state.passes, 2)]
+
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 'exact', 'lower', 'upper'
+
+TTEntry = namedtuple('TTEntry', 'key, depth, bound, value, best_move, generation')
+
+
+class TranspositionTable(object):
+    """Fixed-size table of alphabeta_cutoff_search results keyed by
+    Checkers.position_key.
+
+    A position lives in slot ``key % size``. A slot is overwritten when the
+    new result was searched at least as deep as the stored one, or when the
+    stored one is left over from an earlier search (new_search).
+
+    Values are from the searching player's side and depend on score_array,
+    so a table must not be shared between different score arrays.
+
+    With legacy=True the table is still filled and probed, for its
+    statistics, but the search never cuts off or reorders moves on a hit,
+    so node_counter is the same as without a table.
+
+    backing, if given, is called with the key of a position missing from
+    the table and returns a TTEntry kept for it elsewhere, such as by
+    PositionCache.probe_bounds, or None. Such entries count as left over
+    from an earlier search.
+
+    tt_probe sets reused when an entry left over from an earlier search
+    settles a position that still had plies to search: that search may
+    have reached a depth limit below it, where this one did not look."""
+
+    # The counters stats reports, which take_counts and add_counts move
+    # between the tables of different processes
+    COUNTS = ('hits', 'misses', 'collisions', 'stores', 'loaded')
+
+    def __init__(self, size=1 << 18, legacy=False, backing=None):
+        self.size = size
+        self.legacy = legacy
+        self.backing = backing
+        self.clear()
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.loaded = 0
+        self.reused = False
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        if entry is not None:
+            self.collisions += 1
+        if self.backing is not None:
+            found = self.backing(key)
+            if found is not None:
+                self.loaded += 1
+                if entry is None or entry.generation != self.generation:
+                    self.slots[key % self.size] = found
+                return found
+        return None
+
+    def store(self, key, depth, bound, value, best_move):
+        index = key % self.size
+        entry = self.slots[index]
+        if (entry is None or entry.generation != self.generation or
+                depth >= entry.depth):
+            self.slots[index] = TTEntry(key, depth, bound, value, best_move, self.generation)
+            self.stores += 1
+
+    def take_counts(self):
+        """The counters of the table, which are reset to 0."""
+        counts = dict((name, getattr(self, name)) for name in self.COUNTS)
+        for name in self.COUNTS:
+            setattr(self, name, 0)
+        return counts
+
+    def add_counts(self, counts):
+        for name in self.COUNTS:
+            setattr(self, name, getattr(self, name) + counts[name])
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'collisions': self.collisions, 'stores': self.stores,
+                'loaded': self.loaded, 'hit_rate': float(self.hits) / probes if probes else 0.0,
+                'filled': sum(1 for entry in self.slots if entry is not None)}
+
+
+CacheEntry = namedtuple('CacheEntry', 'key, context, depth, kind, value, best_move, nodes, stamp')
+
+# Kinds of PositionCache records: a root result, or a transposition table bound
+CACHE_KINDS = {'root': 1, EXACT: 2, LOWER_BOUND: 3, UPPER_BOUND: 4}
+_CACHE_KIND_NAMES = dict((number, kind) for kind, number in CACHE_KINDS.items())
+
+
+def cache_context(*parts):
+    """64-bit digest of what a cached result depends on besides the position,
+    such as the algorithm, the depth and the score_array."""
+    parts = tuple(tuple(int(weight) for weight in part) if isinstance(part, list) else part
+                  for part in parts)
+    return int(hashlib.md5(repr(parts).encode('utf-8')).hexdigest()[:16], 16)
+
+
+class PositionCache(object):
+    """Search results kept in a memory-mapped file, so that later runs (and
+    other processes) can reuse them.
+
+    Records are keyed by a Checkers.position_key (the position, the side to
+    move and the searching player) and a cache_context. They hold either
+    the result of a whole search from a root, with its node_counter, or a
+    bound on a position at some remaining depth, as kept by a
+    TranspositionTable.
+
+    The file holds a fixed number of slots, set when it is created, in
+    buckets of BUCKET slots. A new record takes the slot of the same key
+    and context, else an empty one, else the oldest one written in its
+    bucket. Every record carries a checksum; records whose checksum does
+    not match, say after a crash in the middle of a write, count as empty.
+    Readers hold a shared lock and writers an exclusive one, so any number
+    of processes can use one file at the same time."""
+
+    MAGIC = b'CHKCACHE'
+    VERSION = 1
+    BUCKET = 4
+    HEADER = struct.Struct('<8sIIQ')
+    RECORD = struct.Struct('<QQqQIbb4bI')
+    # The key and context a record starts with
+    KEYS = struct.Struct('<QQ')
+
+    def __init__(self, path, size=1 << 16):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.corrupt = 0
+        self.bounds = 0
+        self.file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+        try:
+            self._lock(exclusive=True)
+            try:
+                self.file.seek(0, os.SEEK_END)
+                if self.file.tell() < self.HEADER.size or not self._valid_header():
+                    size = max(self.BUCKET, size - size % self.BUCKET)
+                    self.file.truncate(0)
+                    self.file.write(self.HEADER.pack(self.MAGIC, self.VERSION, size, 0))
+                    self.file.truncate(self.HEADER.size + size * self.RECORD.size)
+                    self.file.flush()
+                self.map = mmap.mmap(self.file.fileno(), 0)
+            finally:
+                self._unlock()
+        except BaseException:
+            self.file.close()
+            raise
+        self.size = self.HEADER.unpack_from(self.map, 0)[2]
+
+    def _valid_header(self):
+        self.file.seek(0)
+        magic, version, size, stamp = self.HEADER.unpack(self.file.read(self.HEADER.size))
+        self.file.seek(0, os.SEEK_END)
+        return (magic == self.MAGIC and version == self.VERSION and size > 0 and
+                self.file.tell() == self.HEADER.size + size * self.RECORD.size)
+
+    def _lock(self, exclusive=False):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+    def _offset(self, slot):
+        return self.HEADER.size + slot * self.RECORD.size
+
+    def _bucket(self, key, context):
+        first = (key ^ context) % (self.size // self.BUCKET) * self.BUCKET
+        return range(first, first + self.BUCKET)
+
+    def _read(self, slot):
+        """The entry in slot, or None if it is empty or corrupt."""
+        fields = self.RECORD.unpack_from(self.map, self._offset(slot))
+        if fields[6] == 0:
+            return None
+        if fields[-1] != self._checksum(fields[:-1]):
+            self.corrupt += 1
+            return None
+        key, context, value, nodes, stamp, depth, kind = fields[:7]
+        move = fields[7:11]
+        if move[0] == -1:
+            best_move = 'pass'
+        elif move[0] == -2:
+            best_move = None
         else:
+            best_move = ((move[0], move[1]), (move[2], move[3]))
+        return CacheEntry(key, context, depth, _CACHE_KIND_NAMES[kind], value, best_move, nodes,
+                          stamp)
+
+    def _checksum(self, fields):
+        return zlib.crc32(self.RECORD.pack(*(tuple(fields) + (0,)))) & 0xffffffff
+
+    def _write(self, key, context, depth, kind, value, best_move, nodes):
+        """Store a record, under the exclusive lock."""
+        magic, version, size, stamp = self.HEADER.unpack_from(self.map, 0)
+        stamp += 1
+        victim = None
+        oldest = None
+        for slot in self._bucket(key, context):
+            entry = self._read(slot)
+            if entry is None or (entry.key == key and entry.context == context):
+                victim = slot
+                break
+            if victim is None or entry.stamp < oldest:
+                victim, oldest = slot, entry.stamp
+        if best_move == 'pass':
+            move = (-1, -1, -1, -1)
+        elif best_move is None:
+            move = (-2, -2, -2, -2)
+        else:
+            move = best_move[0] + best_move[1]
+        fields = (key, context, int(value), nodes, stamp & 0xffffffff, depth,
+                  CACHE_KINDS[kind]) + tuple(move)
+        self.RECORD.pack_into(self.map, self._offset(victim), *(fields + (self._checksum(fields),)))
+        self.HEADER.pack_into(self.map, 0, magic, version, size, stamp)
+        self.stores += 1
+
+    def lookup(self, key, context):
+        """The root result stored for key and context, or None."""
+        self._lock()
+        try:
+            for slot in self._bucket(key, context):
+                entry = self._read(slot)
+                if (entry is not None and entry.kind == 'root' and entry.key == key and
+                        entry.context == context):
+                    self.hits += 1
+                    return entry
+        finally:
+            self._unlock()
+        self.misses += 1
+        return None
+
+    def store_root(self, key, context, depth, best_move, value, nodes):
+        """Store the result of a search from the root with key."""
+        self._lock(exclusive=True)
+        try:
+            self._write(key, context, depth, 'root', value, best_move, nodes)
+        finally:
+            self._unlock()
+
+    def probe_bounds(self, key, context):
+        """The bound kept for key and context, as a TTEntry of generation 0,
+        or None. Only the bucket of key is read, and without the lock, as
+        a TranspositionTable misses positions in the middle of a search: a
+        record caught in the middle of a write fails its checksum and
+        counts as missing."""
+        for slot in self._bucket(key, context):
+            if self.KEYS.unpack_from(self.map, self._offset(slot)) != (key, context):
+                continue
+            entry = self._read(slot)
+            if entry is None or entry.kind == 'root':
+                return None
+            self.bounds += 1
+            return TTEntry(key, entry.depth, entry.kind, entry.value, entry.best_move, 0)
+        return None
+
+    def store_bounds(self, tt, context, min_depth=2):
+        """Keep the entries tt stored in its last search, for context, if they
+        were searched min_depth or more plies deep. Returns how many."""
+        stored = 0
+        self._lock(exclusive=True)
+        try:
+            for entry in tt.slots:
+                if (entry is not None and entry.generation == tt.generation and
+                        entry.depth >= min_depth):
+                    self._write(entry.key, context, entry.depth, entry.bound, entry.value,
+                                entry.best_move, 0)
+                    stored += 1
+        finally:
+            self._unlock()
+        return stored
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores,
+                'bounds': self.bounds, 'corrupt': self.corrupt, 'slots': self.size}
+
+
+class Tablebase(object):
+    """Exact values of the positions with at most max_pieces pieces (stack
+    heights counted, both sides on the board) for one score_array, read
+    from a memory-mapped file written by tablebase.py.
+
+    A value is the Star utility the game ends with when both sides play
+    it out perfectly from the position, whatever the depth limit. It does
+    not depend on the passes that led to the position.
+
+    The file is an open-addressing hash table of SLOT records keyed by
+    Board.zobrist, with ZOBRIST_STAR_TO_MOVE mixed in when Star is to move
+    and the top bit set on used slots."""
+
+    MAGIC = b'CHKTBASE'
+    VERSION = 1
+    HEADER = struct.Struct('<8sIIII8i')
+    SLOT = struct.Struct('<Qi')
+    USED = 1 << 63
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.probes = 0
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.file.close()
+            raise
+        header = self.HEADER.unpack_from(self.map, 0)
+        magic, version, self.max_pieces, self.size, self.entries = header[:5]
+        self.weights = list(header[5:])
+        if (magic != self.MAGIC or version != self.VERSION or
+                len(self.map) != self.HEADER.size + self.size * self.SLOT.size):
+            self.close()
+            raise ValueError('{} is not a tablebase file'.format(path))
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    @classmethod
+    def position_key(cls, board, to_move):
+        key = board.zobrist
+        if to_move == 'Star':
+            key ^= ZOBRIST_STAR_TO_MOVE
+        return key | cls.USED
+
+    def check_score_array(self, score_array):
+        """Raise ValueError unless the table was built for score_array."""
+        if [int(weight) for weight in score_array] != self.weights:
+            raise ValueError('{} was built for the score_array {}'.format(
+                self.path, ','.join(str(weight) for weight in self.weights)))
+
+    def probe(self, board, to_move):
+        """The Star value of board with to_move to move, or None if the
+        position is not in the table."""
+        occupied = board.star | board.circle
+        if not board.star or not board.circle or bin(occupied).count('1') > self.max_pieces:
+            return None
+        counts = board.counts
+        pieces = 0
+        while occupied:
+            low = occupied & -occupied
+            pieces += abs(counts[low.bit_length() - 1])
+            occupied ^= low
+        if pieces > self.max_pieces:
             return None
+        self.probes += 1
+        key = self.position_key(board, to_move)
+        slot = key % self.size
+        while True:
+            stored, value = self.SLOT.unpack_from(self.map,
+                                                  self.HEADER.size + slot * self.SLOT.size)
+            if stored == key:
+                self.hits += 1
+                return value
+            if not stored:
+                return None
+            slot = (slot + 1) % self.size
 
+    def stats(self):
+        return {'positions': self.entries, 'max_pieces': self.max_pieces,
+                'probes': self.probes, 'hits': self.hits}
 
-def alphabeta_cutoff_search(state, game,score_array, d=4, cutoff_test=None,eval_fn=None):
-        """Search game to determine best action; use alpha-beta pruning.
-        This version cuts off search and uses an evaluation function."""
 
-        player = game.to_move(state)
-        global node_counter
-        node_counter = 1
-    
-        # Functions used by alphabeta
-        def max_value(state, alpha, beta, depth):
-            global node_counter
-            if cutoff_test(state, depth,player):
-                node_counter += 1
-                return game.utility(state, player,score_array)
-            v = -infinity
-            loop_counter = 1
-            for a in game.actions(state):
-                game.update_history(a)
-                if loop_counter == 1:
-                    node_counter += 1
-                    loop_counter += 1
-                v = max(v, min_value(game.result(state, a,score_array,player),
-                                     alpha, beta, depth + 1))
-                if v >= beta:
-                    return v
-                alpha = max(alpha, v)
-            return v
-    
-        def min_value(state, alpha, beta, depth):
-            
-            global node_counter
-            
-            if cutoff_test(state, depth,player):
-                node_counter += 1
-                return game.utility(state, player,score_array)
-            v = infinity
-            loop_counter = 1
-            for a in game.actions(state):
-                game.update_history(a)
-                if loop_counter == 1:
-                    node_counter += 1
-                    loop_counter += 1
-                v = min(v, max_value(game.result(state, a,score_array,player),
-                                     alpha, beta, depth + 1))
-                if v <= alpha:
-                    return v
-                beta = min(beta, v)
-            return v
-    
-        # Body of alphabeta_cutoff_search starts here:
-        # The default test cuts off at depth d or at a terminal state
-        cutoff_test = (cutoff_test or
-                       (lambda state, depth,player: depth >= d or
-                        game.terminal_test(state,player)))
-        eval_fn = eval_fn or (lambda state: game.utility(state, player))
-        best_score = -infinity
-        beta = infinity
-        best_action = None
-        for a in game.actions(state):
-            game.update_history(a)
-            v = min_value(game.result(state, a,score_array,player), best_score, beta, 1)
-            if v > best_score:
-                best_score = v
-                best_action = a
-        
-        return best_action,best_score,node_counter
-    
-    
-def minimax_decision(state, game,score_array,d,cutoff_test=None):
-    """Given a state in a game, calculate the best move by searching
-    forward all the way to the terminal states. [Figure 5.3]"""
+class PositionFile(object):
+    """A stream of positions in a compact binary format, for feeding large
+    numbers of them to solve without parsing input.txt files.
+
+    A HEADER is followed by fixed-size RECORDs, one per position: the side
+    to move and the algorithm (as indexes into SIDES and ALGORITHMS), the
+    depth, the signed stack count of every square as in Board.counts and
+    the eight score_array weights. f is a file opened in binary mode, read
+    from for mode 'r' and written to for mode 'w'; records are read
+    CHUNK_RECORDS at a time."""
+
+    MAGIC = b'CHKPOSIT'
+    VERSION = 1
+    HEADER = struct.Struct('<8sI')
+    RECORD = struct.Struct('<BBH64b8i')
+    SIDES = ('Star', 'Circle')
+    ALGORITHMS = ('MINIMAX', 'ALPHABETA', 'PVS')
+    CHUNK_RECORDS = 4096
+
+    def __init__(self, f, mode='r'):
+        self.file = f
+        self.mode = mode
+        if mode == 'w':
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION))
+        else:
+            header = f.read(self.HEADER.size)
+            if (len(header) != self.HEADER.size or
+                    self.HEADER.unpack(header) != (self.MAGIC, self.VERSION)):
+                raise ValueError('{} is not a position file'.format(getattr(f, 'name', f)))
+
+    @classmethod
+    def encode(cls, next_to_move, algorithm, max_depth, initial_board, val):
+        """The record of a position as read by read_input. initial_board
+        may also be a Board."""
+        if not isinstance(initial_board, Board):
+            initial_board = Board.from_rows(initial_board)
+        if next_to_move not in cls.SIDES or algorithm not in cls.ALGORITHMS:
+            raise ValueError('cannot store {} to move with {}'.format(next_to_move, algorithm))
+        return cls.RECORD.pack(cls.SIDES.index(next_to_move),
+                               cls.ALGORITHMS.index(algorithm), max_depth,
+                               *(list(initial_board.counts) + [int(weight) for weight in val]))
+
+    @classmethod
+    def decode(cls, record):
+        """The position of a record, as read_input returns it but for the
+        board, which is a Board."""
+        fields = cls.RECORD.unpack(record)
+        return (cls.SIDES[fields[0]], cls.ALGORITHMS[fields[1]], fields[2],
+                Board.from_counts(fields[3:67]), [str(weight) for weight in fields[67:]])
+
+    def write(self, next_to_move, algorithm, max_depth, initial_board, val):
+        self.file.write(self.encode(next_to_move, algorithm, max_depth, initial_board, val))
+
+    def records(self):
+        """Yield the remaining records undecoded."""
+        size = self.RECORD.size
+        while True:
+            chunk = self.file.read(size * self.CHUNK_RECORDS)
+            if len(chunk) % size:
+                raise ValueError('{} ends in the middle of a record'.format(
+                    getattr(self.file, 'name', self.file)))
+            for offset in range(0, len(chunk), size):
+                yield chunk[offset:offset + size]
+            if len(chunk) < size * self.CHUNK_RECORDS:
+                return
+
+    def __iter__(self):
+        for record in self.records():
+            yield self.decode(record)
+
+
+class SearchStats(object):
+    """What a search did, ply by ply (the root is ply 0).
+
+    nodes counts the positions visited at each ply, leaves those the cutoff
+    test stopped at, expanded those whose moves were searched and cutoffs
+    the expanded ones whose remaining moves were pruned. quiescence counts
+    the positions visited past the depth limit by a quiescence search, at
+    the ply they were found at. node_counter is the count the searches
+    have always reported: every visited position once, the root and the
+    quiescence positions included.
+
+    Inside a timing() block the calls to the game's move_generator,
+    apply_move and undo_move (which stand in for result in the searches),
+    compute_utility and terminal_test are timed as well. The times are
+    inclusive: terminal_test includes any move generation it triggers."""
+
+    TIMED_METHODS = ('move_generator', 'apply_move', 'undo_move', 'compute_utility',
+                     'terminal_test')
+
+    def __init__(self):
+        self.nodes = defaultdict(int)
+        self.leaves = defaultdict(int)
+        self.expanded = defaultdict(int)
+        self.cutoffs = defaultdict(int)
+        self.quiescence = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.fail_lows = 0
+        self.fail_highs = 0
+
+    @property
+    def node_counter(self):
+        return sum(self.nodes.values()) + sum(self.quiescence.values())
+
+    def cutoff_rates(self):
+        """Fraction of the expanded nodes at each ply that were cut off."""
+        return dict((ply, float(self.cutoffs[ply]) / expanded)
+                    for ply, expanded in self.expanded.items() if expanded)
+
+    def effective_branching_factor(self):
+        """Branching factor of the uniform tree with as many nodes at the
+        deepest ply reached as this search visited there."""
+        plies = [ply for ply, nodes in self.nodes.items() if nodes]
+        deepest = max(plies) if plies else 0
+        if deepest == 0:
+            return 0.0
+        return (float(self.nodes[deepest]) / self.nodes[0]) ** (1.0 / deepest)
+
+    def merge(self, other):
+        """Add the counts and times of other to these."""
+        for name in ('nodes', 'leaves', 'expanded', 'cutoffs', 'quiescence', 'seconds', 'calls'):
+            mine = getattr(self, name)
+            for key, value in getattr(other, name).items():
+                mine[key] += value
+        self.fail_lows += other.fail_lows
+        self.fail_highs += other.fail_highs
+
+    @contextmanager
+    def timing(self, game, enabled=True):
+        """Time the calls made to the TIMED_METHODS of game in the block,
+        unless enabled is False."""
+
+        def timed(name, method):
+            seconds = self.seconds
+            calls = self.calls
+
+            def call(*args):
+                started = time.time()
+                try:
+                    return method(*args)
+                finally:
+                    seconds[name] += time.time() - started
+                    calls[name] += 1
+            return call
+
+        if not enabled:
+            yield self
+            return
+        for name in self.TIMED_METHODS:
+            setattr(game, name, timed(name, getattr(game, name)))
+        try:
+            yield self
+        finally:
+            for name in self.TIMED_METHODS:
+                delattr(game, name)
+
+    def report(self):
+        """The statistics as lines of text."""
+        lines = ['node_counter {}, effective branching factor {:.2f}'.format(
+            self.node_counter, self.effective_branching_factor())]
+        rates = self.cutoff_rates()
+        for ply in sorted(self.nodes):
+            lines.append('ply {}: {} nodes, {} leaves, {} expanded, {} cutoffs{}'.format(
+                ply, self.nodes[ply], self.leaves[ply], self.expanded[ply], self.cutoffs[ply],
+                ' (cutoff rate {:.3f})'.format(rates[ply]) if ply in rates else ''))
+        for ply in sorted(self.quiescence):
+            lines.append('quiescence ply {}: {} nodes'.format(ply, self.quiescence[ply]))
+        for name in self.TIMED_METHODS:
+            if self.calls[name]:
+                lines.append('{}: {} calls, {:.3f}s'.format(name, self.calls[name],
+                                                           self.seconds[name]))
+        return lines
+
+
+class MoveOrdering(object):
+    """Orders the moves alphabeta_cutoff_search tries below the root: jumps
+    first, then the killer moves of the ply, then by history score, with
+    generation order kept among equals.
+
+    Killers are the last quiet moves that caused a cutoff at a ply; the
+    history score of a move grows by remaining_depth**2 every time it
+    causes a cutoff anywhere. The root keeps generation order, so among
+    equally good moves the first generated one is still returned.
+
+    With enabled=False moves keep generation order, so node_counter matches
+    the plain search; SearchStats gives the cutoff rates to compare."""
+
+    def __init__(self, enabled=True, killers_per_ply=2):
+        self.enabled = enabled
+        self.killers_per_ply = killers_per_ply
+        self.killers = {}
+        self.history = {}
+
+    def order(self, moves, ply):
+        if not self.enabled or len(moves) < 2:
+            return moves
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def priority(move):
+            if move == 'pass':
+                return (1, 0, 0)
+            jump = abs(move[0][0] - move[1][0]) == 2
+            killer = killers.index(move) if move in killers else len(killers)
+            return (0 if jump else 1, killer, -history.get(move, 0))
+
+        return sorted(moves, key=priority)
+
+    def cutoff(self, move, ply, remaining_depth):
+        """Learn from move causing a cutoff at ply."""
+        if move == 'pass':
+            return
+        self.history[move] = self.history.get(move, 0) + remaining_depth ** 2
+        if abs(move[0][0] - move[1][0]) == 2:
+            return
+        killers = self.killers.setdefault(ply, [])
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.killers_per_ply:]
+
+
+def tt_probe(tt, game, state, player, remaining, actions, alpha, beta):
+    """Look state up in the TranspositionTable tt, for a search of remaining
+    more plies for player. Returns its key, the value if the stored bound
+    settles the node (else None), the narrowed window and the moves with
+    the stored best move first."""
+    key = game.position_key(state, player)
+    entry = tt.probe(key)
+    if entry is None or tt.legacy:
+        return key, None, alpha, beta, actions
+    if entry.depth == remaining:
+        if entry.bound == LOWER_BOUND:
+            alpha = max(alpha, entry.value)
+        elif entry.bound == UPPER_BOUND:
+            beta = min(beta, entry.value)
+        if entry.bound == EXACT or alpha >= beta:
+            if remaining > 0 and entry.generation != tt.generation:
+                tt.reused = True
+            return key, entry.value, alpha, beta, actions
+    if entry.best_move in actions and actions[0] != entry.best_move:
+        actions = list(actions)
+        actions.remove(entry.best_move)
+        actions.insert(0, entry.best_move)
+    return key, None, alpha, beta, actions
+
+
+def tt_store(tt, key, v, alpha, beta, remaining, best_move):
+    """Store the value v a node searched with the window alpha, beta got."""
+    if v <= alpha:
+        bound = UPPER_BOUND
+    elif v >= beta:
+        bound = LOWER_BOUND
+    else:
+        bound = EXACT
+    tt.store(key, remaining, bound, v, best_move)
+
+
+NO_PRUNING, ALPHA_BETA, NULL_WINDOW = 'none', 'alpha-beta', 'null-window'
+
+
+def negamax_search(state, game, score_array, d, pruning=ALPHA_BETA, cutoff_test=None, tt=None,
+                   ordering=None, root_moves=None, alpha=-infinity, beta=infinity, stats=None,
+                   batch_leaves=False, tablebase=None, quiescence=0):
+    """The search behind minimax_decision, alphabeta_cutoff_search and
+    pvs_search, which are configurations of it: pruning is NO_PRUNING,
+    ALPHA_BETA or NULL_WINDOW (alpha-beta that searches all but the first
+    move of a node with a null window first, see pvs_search).
+
+    A single function searches every node. Its values are those of the
+    side to move, the utility to the root player times sign; the window,
+    tt and tablebase values are turned to and from the root player's view,
+    so the move, score and counts are those of separate max and min
+    functions.
+
+    With quiescence, a position cut off at depth d in the middle of a
+    capture exchange is not simply scored: the side to move may take its
+    utility (stand pat) or play one of its jumps, and so on for up to
+    quiescence more plies, with the same pruning. These positions are
+    counted in the quiescence of stats. The other arguments are as in
+    alphabeta_cutoff_search."""
 
     player = game.to_move(state)
-    global node_counter
-    node_counter = 1
-
-    def max_value(state,depth):
-        global node_counter
-        if cutoff_test(state, depth,player):
-            node_counter += 1
-            return game.utility(state, player,score_array)
-        v = -infinity
-        loop_counter = 1
-        for a in game.actions(state):
-            game.update_history(a)
-            if loop_counter == 1:
-                node_counter += 1
-                loop_counter += 1
-            v = max(v, min_value(game.result(state, a,score_array,player),depth + 1))
+    if stats is None:
+        stats = SearchStats()
+    nodes = stats.nodes
+    leaves = stats.leaves
+    expanded = stats.expanded
+    cutoffs = stats.cutoffs
+    quiescence_nodes = stats.quiescence
+    nodes_before = stats.node_counter
+    nodes[0] += 1
+    expanded[0] += 1
+    # The whole search walks this one board with apply_move/undo_move,
+    # which also keep its utility under score_array up to date
+    board = state.board.copy()
+    board.set_score_array(score_array)
+    state = state._replace(board=board)
+
+    # Leaves are scored one by one when they may be extended
+    batch = (batch_leaves and cutoff_test is None and tablebase is None and
+             not quiescence)
+    # The default test, inlined below, cuts off at depth d or at a terminal state
+    default_cutoff = cutoff_test is None
+    terminal_test = game.terminal_test
+    prune = pruning != NO_PRUNING
+    null_window = pruning == NULL_WINDOW
+    actions_of = game.actions
+    apply_move = game.apply_move
+    undo_move = game.undo_move
+    next_state = game.next_state
+    utility = game.utility
+    quiescence_limit = d + quiescence
+
+    def quiesce(state, alpha, beta, depth, sign):
+        v = utility(state, player, score_array) * sign
+        if depth >= quiescence_limit or terminal_test(state, player):
+            return v
+        jumps = [a for a in actions_of(state) if a != 'pass' and abs(a[0][0] - a[1][0]) == 2]
+        if not jumps or prune and v >= beta:
+            return v
+        if v > alpha:
+            alpha = v
+        for a in jumps:
+            undo = apply_move(board, a, state.to_move)
+            quiescence_nodes[depth + 1] += 1
+            child_value = -quiesce(next_state(state, a, board, score_array, player),
+                                   -beta, -alpha, depth + 1, -sign)
+            undo_move(board, undo)
+            if child_value > v:
+                v = child_value
+            if prune:
+                if v >= beta:
+                    break
+                if v > alpha:
+                    alpha = v
         return v
 
-    def min_value(state, depth):
-        global node_counter
-        if cutoff_test(state, depth,player):
-            node_counter += 1
-            return game.utility(state, player,score_array)
-        v = infinity
-        loop_counter = 1
-        for a in game.actions(state):
-            game.update_history(a)
-            if loop_counter == 1:
-                node_counter += 1
-                loop_counter += 1
-            v = min(v, max_value(game.result(state, a,score_array,player),depth + 1))
-            
+    def value(state, alpha, beta, depth, sign):
+        nodes[depth] += 1
+        if tablebase is not None:
+            v = tablebase.probe(state.board, state.to_move)
+            if v is not None:
+                leaves[depth] += 1
+                return v * sign if player == 'Star' else -v * sign
+        if (depth >= d or terminal_test(state, player) if default_cutoff else
+                cutoff_test(state, depth, player)):
+            leaves[depth] += 1
+            if quiescence and depth >= d:
+                return quiesce(state, alpha, beta, depth, sign)
+            return utility(state, player, score_array) * sign
+        actions = actions_of(state)
+        if ordering is not None:
+            actions = ordering.order(actions, depth)
+        if tt is not None:
+            if sign > 0:
+                key, v, alpha, beta, actions = tt_probe(tt, game, state, player, d - depth,
+                                                        actions, alpha, beta)
+            else:
+                key, v, beta, alpha, actions = tt_probe(tt, game, state, player, d - depth,
+                                                        actions, -beta, -alpha)
+                alpha, beta = -alpha, -beta
+            if v is not None:
+                return v * sign
+            alpha_searched = alpha
+            beta_searched = beta
+        expanded[depth] += 1
+        v = -infinity
+        best_move = None
+        values = (child_utilities(game, state, actions, player, score_array)
+                  if batch and depth + 1 >= d else None)
+        for index, a in enumerate(actions):
+            if values is None:
+                undo = apply_move(board, a, state.to_move)
+                child = next_state(state, a, board, score_array, player)
+                if not null_window or best_move is None:
+                    child_value = -value(child, -beta, -alpha, depth + 1, -sign)
+                else:
+                    child_value = -value(child, -alpha - 1, -alpha, depth + 1, -sign)
+                    if alpha < child_value < beta:
+                        child_value = -value(child, -beta, -child_value, depth + 1, -sign)
+                undo_move(board, undo)
+            else:
+                nodes[depth + 1] += 1
+                leaves[depth + 1] += 1
+                child_value = values[index] * sign
+            if child_value > v:
+                v = child_value
+                best_move = a
+            if prune:
+                if v >= beta:
+                    cutoffs[depth] += 1
+                    if ordering is not None:
+                        ordering.cutoff(a, depth, d - depth)
+                    break
+                if v > alpha:
+                    alpha = v
+        if tt is not None:
+            if sign > 0:
+                tt_store(tt, key, v, alpha_searched, beta_searched, d - depth, best_move)
+            else:
+                tt_store(tt, key, -v, -beta_searched, -alpha_searched, d - depth, best_move)
         return v
 
-    # Body of minimax_decision:
-    cutoff_test = (cutoff_test or
-                       (lambda state, depth,player: depth >= d or
-                        game.terminal_test(state,player)))
-    
-    
+    best_score = alpha
     best_action = None
-    best_score = -infinity
-    for a in game.actions(state):
-        game.update_history(a)
-        v = min_value(game.result(state, a,score_array,player), 1)
-        if v > best_score:
+    actions = actions_of(state) if root_moves is None else root_moves
+    # The move the tt remembers is searched first, but the moves generated
+    # before it still take its place on a tie, so the move returned is the
+    # first best one in generation order, as without a tt
+    promoted = None
+    if tt is not None:
+        tt.new_search()
+        root_key = game.position_key(state, player)
+        entry = tt.probe(root_key)
+        if (entry is not None and not tt.legacy and entry.best_move in actions and
+                actions[0] != entry.best_move):
+            actions = list(actions)
+            promoted = entry.best_move
+            earlier = actions.index(promoted)
+            actions.remove(promoted)
+            actions.insert(0, promoted)
+    values = (child_utilities(game, state, actions, player, score_array)
+              if batch and d <= 1 else None)
+    for index, a in enumerate(actions):
+        # Utilities are whole numbers, so a window from best_score - 1 tells
+        # a tie from a worse move
+        tie = promoted is not None and best_action == promoted and 0 < index <= earlier
+        if values is None:
+            undo = apply_move(board, a, state.to_move)
+            child = next_state(state, a, board, score_array, player)
+            if tie:
+                v = -value(child, -beta, -best_score + 1, 1, -1)
+            elif not null_window or best_action is None:
+                v = -value(child, -beta, -best_score, 1, -1)
+            else:
+                # Only a move better than the best one so far can replace it
+                v = -value(child, -best_score - 1, -best_score, 1, -1)
+                if best_score < v < beta:
+                    v = -value(child, -beta, -v, 1, -1)
+            undo_move(board, undo)
+        else:
+            nodes[1] += 1
+            leaves[1] += 1
+            v = values[index]
+        if v > best_score or (tie and v == best_score):
             best_score = v
             best_action = a
+            if best_score >= beta:
+                break
+    if tt is not None and root_moves is None and alpha == -infinity and beta == infinity:
+        tt.store(root_key, d, EXACT, best_score, best_action)
 
-    
-    return best_action,best_score,node_counter
-
-
-""" Reading input from file"""
-
-line_counter = 1
-initial_board = []
-f = open('input.txt','r')
-for line in f:
-    if(line_counter == 1):
-            next_to_move = line.rstrip()
-    elif(line_counter == 2):
-            algorithm = line.rstrip()
-    elif(line_counter == 3):
-            max_depth = int(line.rstrip())
-    elif(line_counter > 3 and line_counter < 12):
-            nline = line.rstrip()
-            arr = nline.split(',')
-            initial_board.append(arr)
-    elif(line_counter == 12):
-            nline = line.rstrip()
-            arr = nline.split(',')
-            val = arr        
-    line_counter += 1
-f.close()
-    
-checkers = Checkers()
-star_list,circle_list = checkers.list_generator(initial_board)
-current_state = GameState(
-        to_move = next_to_move,
-        utility = '0',
-        board = copy.deepcopy(initial_board),
-        moves = checkers.move_generator(initial_board,next_to_move,star_list,circle_list),
-        prev_move = None
-    ) 
-
-if algorithm == 'ALPHABETA':   
-    best_action,best_score,node_counter = alphabeta_cutoff_search(current_state,checkers,val,max_depth,None,None)
-else:   
-    best_action,best_score,node_counter = minimax_decision(current_state,checkers,val,max_depth,None)
-
-#calculate myopic utility 
-myopic_state = checkers.result(current_state,best_action,val,current_state.to_move)
-myopic_utility =  checkers.utility(myopic_state,current_state.to_move,val)   
-
-if best_action != 'pass':  
-    source = best_action[0]
-    destination = best_action[1]
+    return best_action, best_score, stats.node_counter - nodes_before
+
+
+def alphabeta_cutoff_search(state, game,score_array, d=4, cutoff_test=None,eval_fn=None,tt=None,
+                            ordering=None, root_moves=None, alpha=-infinity, beta=infinity,
+                            stats=None, batch_leaves=False, tablebase=None, quiescence=0):
+    """Search game to determine best action; use alpha-beta pruning.
+    This version cuts off search and uses an evaluation function.
+
+    tt is an optional TranspositionTable. Its entries are only used at
+    the depth they were searched to, so the move and score are the ones
+    the plain search finds; only node_counter shrinks.
+
+    ordering is an optional MoveOrdering that sorts the moves of every
+    node below the root. A stored best move from tt is still tried first.
+
+    root_moves limits the root to those moves, and alpha is the score a
+    root move has to beat; when none does, best_action is None. Once a
+    root move reaches beta the search stops: its score is only a lower
+    bound then.
+
+    The search is counted in stats, a SearchStats (a fresh one unless
+    given); the node_counter returned is that of this search alone.
+
+    With batch_leaves (and the default cutoff_test) the children of a
+    node one ply above the depth limit are scored together with
+    batch_utility before the node goes through them. The result and
+    node_counter are the same.
+
+    Positions below the root found in the Tablebase tablebase are leaves
+    worth their exact value.
+
+    quiescence extends capture exchanges past depth d by up to that many
+    plies, as described in negamax_search."""
+
+    return negamax_search(state, game, score_array, d, ALPHA_BETA, cutoff_test, tt, ordering,
+                          root_moves, alpha, beta, stats, batch_leaves, tablebase, quiescence)
+
+
+def pvs_search(state, game, score_array, d=4, cutoff_test=None, tt=None, ordering=None,
+               stats=None, tablebase=None, quiescence=0):
+    """Principal variation search (NegaScout): alpha-beta that searches the
+    first move of every node with the full window and the others with a
+    null window, just wide enough to tell whether they beat the best move so
+    far. Only a move that does is searched again, from the bound the null
+    window gave it.
+
+    Utilities are whole numbers, so the null window around a bound v is
+    (v, v + 1). The move and score are those of alphabeta_cutoff_search;
+    the better the first moves (ordering, tt), the fewer nodes it visits.
+    The arguments are as in alphabeta_cutoff_search, and re-searched nodes
+    are counted again."""
+
+    return negamax_search(state, game, score_array, d, NULL_WINDOW, cutoff_test, tt, ordering,
+                          stats=stats, tablebase=tablebase, quiescence=quiescence)
+
+
+def aspiration_search(state, game, score_array, d, guess, width, cutoff_test=None, tt=None,
+                      ordering=None, stats=None, tablebase=None, quiescence=0):
+    """alphabeta_cutoff_search with the root window guess - width, guess + width
+    to start with. A search that fails low (no move beats the window) or
+    high (a move reaches its top) is repeated with the window moved past
+    the bound it found and twice as wide, until the score falls inside.
+
+    Returns (best_action, best_score, node_counter) like the full-window
+    search, whose move and score it finds; node_counter and the fail_lows
+    and fail_highs of stats count the repeated searches too."""
+
+    if stats is None:
+        stats = SearchStats()
+    nodes_before = stats.node_counter
+    alpha = guess - width
+    beta = guess + width
+    while True:
+        best_action, best_score, nodes = alphabeta_cutoff_search(
+            state, game, score_array, d, cutoff_test, None, tt, ordering, alpha=alpha, beta=beta,
+            stats=stats, tablebase=tablebase, quiescence=quiescence)
+        # Utilities are whole numbers, so a score at or below alpha is below
+        # alpha + 1 and one at or above best_score is above best_score - 1
+        if best_action is None:
+            stats.fail_lows += 1
+            width *= 2
+            alpha, beta = alpha - width, alpha + 1
+        elif best_score >= beta:
+            stats.fail_highs += 1
+            width *= 2
+            alpha, beta = best_score - 1, best_score + width
+        else:
+            return best_action, best_score, stats.node_counter - nodes_before
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search once its deadline has passed."""
+
+
+def iterative_deepening_search(state, game, score_array, time_budget, max_depth=None, tt=None,
+                               ordering=None, stats=None, tablebase=None, aspiration=None,
+                               quiescence=0):
+    """Run alphabeta_cutoff_search at depth 1, 2, 3... for time_budget seconds
+    and return (best_action, best_score, node_counter, depth) of the deepest
+    iteration that completed.
+
+    Every iteration leaves its best moves in tt (a fresh TranspositionTable
+    unless one is given) and its killer and history scores in ordering (a
+    fresh MoveOrdering unless one is given), and the next iteration tries
+    those moves first.
+    Depth 1 always completes; a later iteration still running when the
+    budget is spent is abandoned. node_counter adds up all iterations, as
+    do the counts in stats.
+    Deepening also stops at max_depth, or once an iteration reached no
+    position at its depth limit, as then the whole game tree was searched;
+    not when tt settled a position with a result from before the iteration
+    (see TranspositionTable), which may hide a depth limit.
+    With an aspiration width, every iteration after the first is an
+    aspiration_search around the score of the one before."""
+
+    deadline = time.time() + time_budget
+    if tt is None:
+        tt = TranspositionTable()
+    if ordering is None:
+        ordering = MoveOrdering()
+    if stats is None:
+        stats = SearchStats()
+    nodes_before = stats.node_counter
+    if max_depth is not None:
+        # alphabeta_cutoff_search still tries every root move at depth 0
+        max_depth = max(max_depth, 1)
+    completed = None
+    depth = 0
+    while max_depth is None or depth < max_depth:
+        depth += 1
+        depth_limited = [False]
+        tt.reused = False
+
+        def cutoff_test(state, ply, player, depth=depth, depth_limited=depth_limited):
+            if depth > 1 and time.time() > deadline:
+                raise SearchTimeout()
+            if ply >= depth:
+                depth_limited[0] = True
+                return True
+            return game.terminal_test(state, player)
+
+        try:
+            if aspiration is not None and completed is not None:
+                best_action, best_score, nodes = aspiration_search(
+                    state, game, score_array, depth, completed[1], aspiration, cutoff_test, tt,
+                    ordering, stats, tablebase, quiescence)
+            else:
+                best_action, best_score, nodes = alphabeta_cutoff_search(
+                    state, game, score_array, depth, cutoff_test, None, tt, ordering,
+                    stats=stats, tablebase=tablebase, quiescence=quiescence)
+        except SearchTimeout:
+            break
+        completed = (best_action, best_score, depth)
+        if not (depth_limited[0] or tt.reused) or time.time() > deadline:
+            break
+
+    best_action, best_score, depth = completed
+    return best_action, best_score, stats.node_counter - nodes_before, depth
+
+
+def minimax_decision(state, game,score_array,d,cutoff_test=None,root_moves=None,stats=None,
+                     batch_leaves=False, quiescence=0):
+    """Given a state in a game, calculate the best move by searching
+    forward all the way to the terminal states. [Figure 5.3]
+
+    root_moves limits the root to those moves. The search is counted in
+    stats, leaves are scored in batches with batch_leaves and capture
+    exchanges are extended with quiescence, as in alphabeta_cutoff_search."""
+
+    return negamax_search(state, game, score_array, d, NO_PRUNING, cutoff_test,
+                          root_moves=root_moves, stats=stats, batch_leaves=batch_leaves,
+                          quiescence=quiescence)
+
+
+# What the root-search worker processes search, set up by _init_root_worker
+_root_search = {}
+
+
+def _init_root_worker(state, game, score_array, d, algorithm, shared_alpha, tablebase,
+                      quiescence, tt_size, tt_legacy, order_moves, batch_leaves, timed):
+    # A SearchStats.timing block of the parent forked along with game would
+    # time into the parent's copy of its stats, which is lost: the worker
+    # times its own searches instead
+    for name in SearchStats.TIMED_METHODS:
+        game.__dict__.pop(name, None)
+    # Every worker keeps its own table and move ordering for all the root
+    # moves it searches
+    _root_search.update(state=state, game=game, score_array=score_array, d=d,
+                        algorithm=algorithm, shared_alpha=shared_alpha, tablebase=tablebase,
+                        quiescence=quiescence, batch_leaves=batch_leaves,
+                        tt=TranspositionTable(tt_size, tt_legacy) if tt_size else None,
+                        ordering=MoveOrdering() if order_moves else None, timed=timed)
+
+
+def _search_root_move(index):
+    """Search root move number index in a worker process. Returns the index,
+    the move's value, whether that value is exact (rather than an upper
+    bound), the SearchStats of the search and the counts of the worker's
+    TranspositionTable during it (or None)."""
+    state = _root_search['state']
+    game = _root_search['game']
+    score_array = _root_search['score_array']
+    tt = _root_search['tt']
+    move = state.moves[index]
+    stats = SearchStats()
+    if _root_search['algorithm'] != 'ALPHABETA':
+        with stats.timing(game, _root_search['timed']):
+            best_action, value, nodes = minimax_decision(
+                state, game, score_array, _root_search['d'], None, [move], stats,
+                batch_leaves=_root_search['batch_leaves'], quiescence=_root_search['quiescence'])
+        return index, value, True, stats, None
+
+    shared_alpha = _root_search['shared_alpha']
+    with stats.timing(game, _root_search['timed']):
+        best_action, value, nodes = alphabeta_cutoff_search(
+            state, game, score_array, _root_search['d'], tt=tt,
+            ordering=_root_search['ordering'], root_moves=[move], alpha=shared_alpha.value,
+            stats=stats, batch_leaves=_root_search['batch_leaves'],
+            tablebase=_root_search['tablebase'], quiescence=_root_search['quiescence'])
+    counts = tt.take_counts() if tt is not None else None
+    if best_action is None:
+        return index, value, False, stats, counts
+    with shared_alpha.get_lock():
+        if value > shared_alpha.value:
+            shared_alpha.value = value
+    return index, value, True, stats, counts
+
+
+def parallel_root_search(state, game, score_array, d, algorithm='ALPHABETA', workers=None,
+                         stats=None, tablebase=None, quiescence=0, tt=None, ordering=None,
+                         batch_leaves=False, timed=False):
+    """Search the root moves of state in a pool of worker processes with
+    alpha-beta (or, for any other algorithm, minimax) and return
+    (best_action, best_score, node_counter).
+
+    For alpha-beta the first root move is searched here first, to get a
+    bound, and the workers then share the best root score found so far as
+    their alpha bound. The move and score are those of the sequential
+    search, whatever the number of workers: the first generated of the
+    best moves. The workers' counts are merged into stats; for alpha-beta
+    they depend on which moves finish first. The searches use tablebase
+    (alpha-beta only), batch_leaves and quiescence as
+    alphabeta_cutoff_search does.
+
+    tt and ordering (alpha-beta only) serve the searches in this process;
+    every worker has a TranspositionTable of the same size and a fresh
+    MoveOrdering of its own, and the counts of the workers' tables are
+    added to those of tt.
+
+    With timed, the workers time the game's methods as SearchStats.timing
+    does, into the SearchStats merged into stats."""
+
+    if stats is None:
+        stats = SearchStats()
+    actions = game.actions(state)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(actions))
+    if workers < 2:
+        if algorithm == 'ALPHABETA':
+            return alphabeta_cutoff_search(state, game, score_array, d, tt=tt, ordering=ordering,
+                                           stats=stats, batch_leaves=batch_leaves,
+                                           tablebase=tablebase, quiescence=quiescence)
+        return minimax_decision(state, game, score_array, d, stats=stats,
+                                batch_leaves=batch_leaves, quiescence=quiescence)
+
+    nodes_before = stats.node_counter
+    results = []
+    shared_alpha = multiprocessing.Value('d', -infinity)
+    if algorithm == 'ALPHABETA':
+        first_stats = SearchStats()
+        best_action, value, nodes = alphabeta_cutoff_search(state, game, score_array, d,
+                                                            tt=tt, ordering=ordering,
+                                                            root_moves=actions[:1],
+                                                            stats=first_stats,
+                                                            batch_leaves=batch_leaves,
+                                                            tablebase=tablebase,
+                                                            quiescence=quiescence)
+        results.append((0, value, True, first_stats, None))
+        shared_alpha.value = value
+    pool = multiprocessing.Pool(workers, _init_root_worker,
+                                (state, game, score_array, d, algorithm, shared_alpha,
+                                 tablebase, quiescence, tt.size if tt is not None else 0,
+                                 tt is not None and tt.legacy, ordering is not None,
+                                 batch_leaves, timed))
+    try:
+        results.extend(pool.imap_unordered(_search_root_move, range(len(results), len(actions))))
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    results.sort()
+
+    searches = len(results)
+    for index, value, exact, move_stats, counts in results:
+        stats.merge(move_stats)
+        if counts is not None:
+            tt.add_counts(counts)
+    best_score = max(value for index, value, exact, move_stats, counts in results if exact)
+    best_action = None
+    for index, value, exact, move_stats, counts in results:
+        if value < best_score:
+            continue
+        if not exact:
+            # An earlier move whose bound reaches the best score may tie it.
+            # Utilities are whole numbers, so searching above best_score - 1
+            # tells; a tie makes it the move the sequential search picks
+            searches += 1
+            found, value, nodes = alphabeta_cutoff_search(
+                state, game, score_array, d, tt=tt, ordering=ordering,
+                root_moves=[actions[index]], alpha=best_score - 1, stats=stats,
+                batch_leaves=batch_leaves, tablebase=tablebase, quiescence=quiescence)
+            if found is None or value < best_score:
+                continue
+        best_action = actions[index]
+        best_score = value
+        break
+    # Every search counted the root, which is one node
+    stats.nodes[0] -= searches - 1
+    stats.expanded[0] -= searches - 1
+    return best_action, best_score, stats.node_counter - nodes_before
+
+
+def add_search_arguments(parser):
+    """Add the search options of solve to an argparse parser."""
+    parser.add_argument('--tt-size', type=int, default=0,
+                        help='transposition table slots for ALPHABETA and PVS (default: no table)')
+    parser.add_argument('--tt-legacy', action='store_true',
+                        help='only gather table statistics, keeping the plain node count')
+    parser.add_argument('--time-budget', type=float,
+                        help='for ALPHABETA, deepen one ply at a time until this many '
+                             'seconds have passed, up to the depth on line 3')
+    parser.add_argument('--aspiration', type=int, metavar='WIDTH',
+                        help='for ALPHABETA, search a window this wide on either side of '
+                             'the expected score first, widening it when the score falls outside')
+    parser.add_argument('--expected-score', type=int,
+                        help='the score the first aspiration window is centred on (default: '
+                             'the utility of the position itself)')
+    parser.add_argument('--order-moves', action='store_true',
+                        help='for ALPHABETA, try jumps, killer moves and high history scores first '
+                             '(PVS always does)')
+    parser.add_argument('--distinct-moves', action='store_true',
+                        help='generate each move of a stack once instead of once per piece, '
+                             'which changes node_counter but not the move or score')
+    parser.add_argument('--quiescence', type=int, default=0, metavar='PLIES',
+                        help='keep searching jumps for up to this many plies past the depth '
+                             'limit, so that no capture exchange is cut off halfway '
+                             '(default: %(default)s)')
+    parser.add_argument('--search-stats', action='store_true',
+                        help='print nodes, leaves and cutoffs per ply and the time spent '
+                             'in move generation, moves, utilities and terminal tests')
+    parser.add_argument('--batch-leaves', action='store_true',
+                        help='score the leaves below each node together (vectorized '
+                             'with NumPy when it is installed)')
+    parser.add_argument('--tablebase', metavar='PATH',
+                        help='for ALPHABETA and PVS, take exact values from this tablebase.py file')
+    parser.add_argument('--cache', metavar='PATH',
+                        help='reuse and keep search results in this file across runs')
+    parser.add_argument('--cache-size', type=int, default=1 << 16,
+                        help='records a new cache file holds (default: %(default)s)')
+    parser.add_argument('--cache-verify', action='store_true',
+                        help='search positions found in the cache anyway and report '
+                             'any difference')
+
+
+def search_options(args):
+    """The solve keyword arguments for arguments parsed with add_search_arguments."""
+    return dict(tt_size=args.tt_size, tt_legacy=args.tt_legacy, time_budget=args.time_budget,
+                aspiration=args.aspiration, expected_score=args.expected_score,
+                order_moves=args.order_moves, distinct_moves=args.distinct_moves,
+                quiescence=args.quiescence, search_stats=args.search_stats,
+                batch_leaves=args.batch_leaves, tablebase_path=args.tablebase,
+                cache_path=args.cache, cache_size=args.cache_size,
+                cache_verify=args.cache_verify)
+
+
+def read_input(f):
+    """ Reading input from file"""
+
+    line_counter = 1
+    initial_board = []
+    for line in f:
+        if(line_counter == 1):
+                next_to_move = line.rstrip()
+        elif(line_counter == 2):
+                algorithm = line.rstrip()
+        elif(line_counter == 3):
+                max_depth = int(line.rstrip())
+        elif(line_counter > 3 and line_counter < 12):
+                nline = line.rstrip()
+                arr = nline.split(',')
+                initial_board.append(arr)
+        elif(line_counter == 12):
+                nline = line.rstrip()
+                arr = nline.split(',')
+                val = arr        
+        line_counter += 1
+    return next_to_move, algorithm, max_depth, initial_board, val
+
+
+def solve(next_to_move, algorithm, max_depth, initial_board, val, tt_size=0, tt_legacy=False,
+          time_budget=None, aspiration=None, expected_score=None, order_moves=False,
+          distinct_moves=False, quiescence=0, search_stats=False, batch_leaves=False, workers=1,
+          tablebase_path=None, cache_path=None, cache_size=1 << 16, cache_verify=False, passes=0,
+          log=None, tt=None):
+    """Pick the move for a position as read by read_input and return the
+    four output.txt values: the move, its myopic utility, the searched
+    score and node_counter. The board may also be a Board, as in the
+    positions of a PositionFile. Statistics are written to log, if given.
+
+    With cache_path the answer is looked up in that PositionCache first
+    (unless the search has a time_budget, which makes it vary), and stored
+    there after a search; a transposition table also looks the positions
+    it misses up among the bounds earlier searches left in the cache.
+    cache_verify searches even when the answer is cached, and reports
+    answers that differ.
+
+    tablebase_path names a Tablebase built for val, which the alpha-beta
+    searches then take exact values from.
+
+    aspiration is the half-width of the first root window of ALPHABETA,
+    centred on expected_score or else on the utility of the position; with
+    a time_budget it centres each iteration on the score of the last.
+
+    distinct_moves searches every move of a stack once (see Checkers),
+    leaving the legacy node_counter behind. quiescence extends capture
+    exchanges past max_depth by up to that many plies.
+
+    tt is a TranspositionTable to search with instead of a fresh one of
+    tt_size slots, such as one kept across the positions of a session. It
+    must only ever have been used with the same val; tt_size still names
+    the size in the cache contexts.
+
+    workers > 1 searches the root moves of MINIMAX and of ALPHABETA in that
+    many processes (see parallel_root_search); PVS, and ALPHABETA with a
+    time_budget or aspiration, always search in one.
+
+    passes is the number of passes in a row that led to the position, for
+    positions taken from a game in progress."""
+
+    checkers = Checkers(distinct_moves)
+    if not isinstance(initial_board, Board):
+        initial_board = Board.from_rows(initial_board)
+    current_state = GameState(
+            to_move = next_to_move,
+            utility = '0',
+            board = initial_board,
+            moves = checkers.move_generator(initial_board,next_to_move),
+            prev_move = None,
+            passes = passes
+        ) 
+
+    if tt is None and tt_size > 0:
+        tt = TranspositionTable(tt_size, legacy=tt_legacy)
+    # Principal variation search relies on good first moves
+    ordering = (MoveOrdering() if order_moves or time_budget is not None or algorithm == 'PVS'
+                else None)
+    stats = SearchStats()
+    parallel = workers > 1 and algorithm != 'PVS' and not (
+        algorithm == 'ALPHABETA' and (time_budget is not None or aspiration is not None))
+    if workers > 1 and not parallel and log is not None:
+        log.write('workers: this search runs in one process\n')
+
+    tablebase = Tablebase(tablebase_path) if tablebase_path is not None else None
+    cache = None
+    try:
+        if tablebase is not None:
+            tablebase.check_score_array(val)
+            tablebase_pieces = tablebase.max_pieces
+        else:
+            tablebase_pieces = None
+        if cache_path is not None:
+            cache = PositionCache(cache_path, cache_size)
+        cached = None
+        if cache is not None and time_budget is None:
+            root_key = checkers.position_key(current_state, next_to_move)
+            root_context = cache_context('root', algorithm, max_depth, val, tt_size, tt_legacy,
+                                         order_moves, workers, tablebase_pieces, aspiration,
+                                         expected_score, distinct_moves, quiescence)
+            cached = cache.lookup(root_key, root_context)
+        if cached is None or cache_verify:
+            bound_context = cache_context('bounds', val, tablebase_pieces, quiescence)
+            if cache is not None and tt is not None and not tt.legacy:
+                tt.backing = lambda key: cache.probe_bounds(key, bound_context)
+            with stats.timing(checkers, search_stats):
+                if algorithm == 'ALPHABETA' and time_budget is not None:
+                    best_action,best_score,node_counter,reached_depth = iterative_deepening_search(
+                        current_state,checkers,val,time_budget,max_depth,tt,ordering,stats,
+                        tablebase,aspiration,quiescence)
+                    if log is not None:
+                        log.write('iterative deepening completed depth {}\n'.format(reached_depth))
+                elif algorithm == 'PVS':
+                    best_action,best_score,node_counter = pvs_search(
+                        current_state,checkers,val,max_depth,None,tt,ordering,stats,tablebase,
+                        quiescence)
+                elif algorithm == 'ALPHABETA' and aspiration is not None:
+                    if expected_score is None:
+                        expected_score = checkers.utility(current_state,next_to_move,val)
+                    best_action,best_score,node_counter = aspiration_search(
+                        current_state,checkers,val,max_depth,expected_score,aspiration,None,tt,
+                        ordering,stats,tablebase,quiescence)
+                elif parallel:
+                    best_action,best_score,node_counter = parallel_root_search(
+                        current_state,checkers,val,max_depth,algorithm,workers,stats,tablebase,
+                        quiescence,tt,ordering,batch_leaves,search_stats)
+                elif algorithm == 'ALPHABETA':   
+                    best_action,best_score,node_counter = alphabeta_cutoff_search(
+                        current_state,checkers,val,max_depth,None,None,tt,ordering,stats=stats,
+                        batch_leaves=batch_leaves,tablebase=tablebase,quiescence=quiescence)
+                else:   
+                    best_action,best_score,node_counter = minimax_decision(
+                        current_state,checkers,val,max_depth,None,stats=stats,
+                        batch_leaves=batch_leaves,quiescence=quiescence)
+
+            if cache is not None and tt is not None and not tt.legacy:
+                cache.store_bounds(tt, bound_context)
+            # Node counts vary with parallel alpha-beta, and with the bounds
+            # the table was seeded with
+            nodes_vary = parallel or (tt is not None and not tt.legacy)
+            if cached is None or (cached.best_move, cached.value) != (best_action, best_score) or (
+                    not nodes_vary and cached.nodes != node_counter):
+                if cached is not None and log is not None:
+                    log.write('cache mismatch: cached {} {} {}, searched {} {} {}\n'.format(
+                        cached.best_move, cached.value, cached.nodes,
+                        best_action, best_score, node_counter))
+                if cache is not None and time_budget is None:
+                    cache.store_root(root_key, root_context, max_depth, best_action, best_score,
+                                     node_counter)
+            elif log is not None:
+                log.write('cache verified\n')
+        else:
+            best_action, best_score, node_counter = cached.best_move, cached.value, cached.nodes
+        if log is not None and cache is not None:
+            log.write('position cache: {}\n'.format(cache.stats()))
+        if log is not None and tablebase is not None:
+            log.write('tablebase: {}\n'.format(tablebase.stats()))
+    finally:
+        if cache is not None:
+            cache.close()
+            if tt is not None:
+                tt.backing = None
+        if tablebase is not None:
+            tablebase.close()
+
+    if log is not None and aspiration is not None and algorithm == 'ALPHABETA':
+        log.write('aspiration windows: {} failed low, {} failed high\n'.format(
+            stats.fail_lows, stats.fail_highs))
+    if log is not None and tt is not None:
+        log.write('transposition table: {}\n'.format(tt.stats()))
+    if log is not None and search_stats:
+        for line in stats.report():
+            log.write(line + '\n')
+
+    #calculate myopic utility 
+    myopic_state = checkers.result(current_state,best_action,val,current_state.to_move)
+    myopic_utility =  checkers.utility(myopic_state,current_state.to_move,val)   
+
+    return format_move(best_action), myopic_utility, best_score, node_counter
+
+
+def format_move(move):
+    """The output.txt form of a move: 'pass', or squares like 'C4-A6'."""
+    if move == 'pass':
+        return move
+    source = move[0]
+    destination = move[1]
 
     source_alphabet = str(unichr(65 + (7-source[0])))
     source_column = source[1]+1
-    
+
     destination_alphabet = str(unichr(65 + (7-destination[0])))
     destination_column = destination[1]+1
-    
-    best_action = source_alphabet + str(source_column) + '-'+destination_alphabet+str(destination_column)
-
-f = open('output.txt','w')
-f.write(str(best_action)+"\n")  
-f.write(str(myopic_utility)+"\n")  
-f.write(str(best_score)+"\n")  
-f.write(str(node_counter)+"\n")
-f.close() 
-   
\ No newline at end of file
+
+    return source_alphabet + str(source_column) + '-'+destination_alphabet+str(destination_column)
+
+
+def parse_move(text):
+    """The move of its output.txt form, as format_move writes it."""
+    if text == 'pass':
+        return text
+    source, destination = text.split('-')
+    return ((7 - (ord(source[0]) - 65), int(source[1:]) - 1),
+            (7 - (ord(destination[0]) - 65), int(destination[1:]) - 1))
+
+
+def write_output(f, answer):
+    best_action, myopic_utility, best_score, node_counter = answer
+    f.write(str(best_action)+"\n")  
+    f.write(str(myopic_utility)+"\n")  
+    f.write(str(best_score)+"\n")  
+    f.write(str(node_counter)+"\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Pick the next move for the position in input.txt.')
+    add_search_arguments(parser)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='search the root moves in this many processes, for MINIMAX '
+                             'and ALPHABETA (the ALPHABETA node count then varies from run to '
+                             'run); each worker has its own --tt-size table and move ordering. '
+                             'Not with --time-budget or --aspiration; PVS ignores it')
+    args = parser.parse_args(argv)
+    if args.workers > 1 and (args.time_budget is not None or args.aspiration is not None):
+        parser.error('--workers cannot be combined with --time-budget or --aspiration')
+
+    f = open('input.txt','r')
+    position = read_input(f)
+    f.close()
+
+    answer = solve(*position, workers=args.workers, log=sys.stderr, **search_options(args))
+
+    f = open('output.txt','w')
+    write_output(f, answer)
+    f.close() 
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Convert positions between the input.txt format and PositionFile streams.
+
+    python positions.py input*.txt positions/ -o positions.bin
+    python positions.py --to-text positions.bin --out-dir inputs/
+    python batch_solve.py positions.bin --jsonl results.jsonl
+
+A position file holds any number of positions in fixed-size binary
+records, which batch_solve.py reads without parsing text or opening a
+file per position. Directories stand for the input*.txt files inside
+them, as for batch_solve.py.
+"""
+
+import argparse
+import os
+import sys
+
+import hw1cs561s2018 as engine
+from batch_solve import expand_inputs
+
+
+def format_input(next_to_move, algorithm, max_depth, initial_board, val):
+    """The input.txt text of a position."""
+    if isinstance(initial_board, engine.Board):
+        initial_board = initial_board.to_rows()
+    lines = [next_to_move, algorithm, str(max_depth)]
+    lines.extend(','.join(row) for row in initial_board)
+    lines.append(','.join(val))
+    return '\n'.join(lines) + '\n'
+
+
+def to_binary(paths, output):
+    """Write the positions of the input.txt files paths to output. Returns
+    how many were written."""
+    f = open(output, 'wb')
+    try:
+        positions = engine.PositionFile(f, 'w')
+        for path in paths:
+            text = open(path, 'r')
+            try:
+                positions.write(*engine.read_input(text))
+            finally:
+                text.close()
+    finally:
+        f.close()
+    return len(paths)
+
+
+def to_text(paths, out_dir):
+    """Write every position of the position files paths to its own
+    input<number>.txt in out_dir. Returns how many were written."""
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    written = 0
+    for path in paths:
+        f = open(path, 'rb')
+        try:
+            for position in engine.PositionFile(f):
+                written += 1
+                out = open(os.path.join(out_dir, 'input{}.txt'.format(written)), 'w')
+                out.write(format_input(*position))
+                out.close()
+        finally:
+            f.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert positions to and from position files.')
+    parser.add_argument('inputs', nargs='+',
+                        help='input files, globs or directories (position files with --to-text)')
+    parser.add_argument('-o', '--output', help='position file to write')
+    parser.add_argument('--to-text', action='store_true',
+                        help='write the positions of position files as input.txt files')
+    parser.add_argument('--out-dir', help='directory for the input.txt files of --to-text')
+    args = parser.parse_args(argv)
+
+    if args.to_text:
+        if args.out_dir is None:
+            parser.error('--to-text needs --out-dir')
+        written = to_text(args.inputs, args.out_dir)
+    else:
+        if args.output is None:
+            parser.error('writing a position file needs --output')
+        written = to_binary(expand_inputs(args.inputs), args.output)
+    sys.stderr.write('converted {} positions\n'.format(written))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
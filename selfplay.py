@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Play complete games between two engine configurations.
+
+    python selfplay.py --first depth=4 --second depth=4,order_moves=1
+    python selfplay.py --first algorithm=PVS,depth=9 \\
+        --second depth=20,time_budget=0.2,quiescence=4 --random 50 --jobs 8
+    python selfplay.py input6.txt --first depth=3,score_array=5:10:15:20:25:30:35:40
+
+A configuration is a comma-separated list of key=value settings: the
+algorithm and depth it searches with, the score_array it evaluates with
+(weights separated by ':', by default those of the game) and any solve
+keyword, such as order_moves, tt_size, time_budget or quiescence. With a
+time_budget, ALPHABETA deepens up to depth.
+
+Games start from the given input.txt files (by default the bundled
+input*.txt fixtures) and from --random generated positions. Every start is
+played twice, each configuration taking each side once. A game ends when
+a side has no pieces left or both sides have passed in a row, and is won
+by the side ahead under the score_array of its start position.
+
+Games run in a pool of processes. The results are reported on stderr as
+games per second, nodes per second of each configuration, and the wins,
+draws and losses of the first configuration with a 95% confidence
+interval on its score and the matching Elo difference.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import hw1cs561s2018 as engine
+from batch_solve import expand_inputs
+from benchmark import random_position
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Types of the settings a configuration may give; the others are solve's
+SETTINGS = {'algorithm': str, 'depth': int, 'score_array': lambda text: text.split(':'),
+            'tt_size': int, 'tt_legacy': bool, 'time_budget': float, 'aspiration': int,
+            'order_moves': bool, 'distinct_moves': bool, 'quiescence': int,
+            'batch_leaves': bool, 'tablebase_path': str}
+TRUE = ('1', 'true', 'yes', 'on')
+
+
+def parse_config(text):
+    """The settings of a configuration string, with the algorithm and depth
+    defaulting to ALPHABETA and 4."""
+    config = {'algorithm': 'ALPHABETA', 'depth': 4}
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        if '=' not in item:
+            raise ValueError('expected key=value, got {!r}'.format(item))
+        key, value = [part.strip() for part in item.split('=', 1)]
+        if key not in SETTINGS:
+            raise ValueError('unknown setting {!r}'.format(key))
+        if SETTINGS[key] is bool:
+            config[key] = value.lower() in TRUE
+        else:
+            try:
+                config[key] = SETTINGS[key](value)
+            except ValueError:
+                raise ValueError('bad value {!r} for {}'.format(value, key))
+    return config
+
+
+def play_game(task):
+    """Play one game in a worker. task is (game number, start name, start
+    position, {side: (player, config)}), optionally followed by whether to
+    record the positions of the game. Returns the game as a dict; recorded
+    positions are under 'positions' as the Board.counts of every position
+    the game went through, as strings."""
+    number, name, (to_move, rows, score_array), players = task[:4]
+    record = len(task) > 4 and task[4]
+    started = time.time()
+    checkers = engine.Checkers()
+    board = engine.Board.from_rows(rows)
+    passes = 0
+    plies = 0
+    nodes = {0: 0, 1: 0}
+    seconds = {0: 0.0, 1: 0.0}
+    positions = []
+    while board.star and board.circle and passes < 2:
+        if record:
+            positions.append(board.counts.tostring())
+        player, config = players[to_move]
+        options = dict((key, value) for key, value in config.items()
+                       if key not in ('algorithm', 'depth', 'score_array'))
+        search_started = time.time()
+        move, myopic_utility, score, node_counter = engine.solve(
+            to_move, config['algorithm'], config['depth'], board.copy(),
+            config.get('score_array', score_array), passes=passes, **options)
+        seconds[player] += time.time() - search_started
+        nodes[player] += node_counter
+        move = engine.parse_move(move)
+        if move == 'pass':
+            passes += 1
+        else:
+            checkers.apply_move(board, move, to_move)
+            passes = 0
+        plies += 1
+        to_move = 'Circle' if to_move == 'Star' else 'Star'
+
+    if record:
+        positions.append(board.counts.tostring())
+    star_score = board.score_under(engine.parse_weights(score_array))
+    first_side = 'Star' if players['Star'][0] == 0 else 'Circle'
+    first_score = star_score if first_side == 'Star' else -star_score
+    if first_score > 0:
+        result = 1.0
+    elif first_score < 0:
+        result = 0.0
+    else:
+        result = 0.5
+    game = {'game': number, 'start': name, 'first_plays': first_side, 'plies': plies,
+            'score': first_score, 'result': result, 'nodes': [nodes[0], nodes[1]],
+            'search_seconds': [seconds[0], seconds[1]], 'seconds': time.time() - started}
+    if record:
+        game['positions'] = positions
+    return game
+
+
+def score_interval(results, z=1.96):
+    """The mean of results (1 for a win, 0.5 for a draw, 0 for a loss) and
+    its normal-approximation confidence interval."""
+    n = len(results)
+    mean = sum(results) / n
+    variance = sum((result - mean) ** 2 for result in results) / n
+    margin = z * math.sqrt(variance / n)
+    return mean, max(0.0, mean - margin), min(1.0, mean + margin)
+
+
+def elo(score):
+    """The Elo difference that gives score as the expected result."""
+    if score <= 0.0:
+        return -float('inf')
+    if score >= 1.0:
+        return float('inf')
+    return 400.0 * math.log10(score / (1.0 - score))
+
+
+def make_tasks(starts, first, second, record=False):
+    """Two games for every start, the first configuration playing Star in
+    one and Circle in the other, recording their positions if record."""
+    tasks = []
+    for name, start in starts:
+        for first_side in ('Star', 'Circle'):
+            second_side = 'Circle' if first_side == 'Star' else 'Star'
+            tasks.append((len(tasks) + 1, name, start,
+                          {first_side: (0, first), second_side: (1, second)}, record))
+    return tasks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play games between two engine configurations.')
+    parser.add_argument('inputs', nargs='*',
+                        help='input.txt files, globs or directories to start games from '
+                             '(default: the bundled fixtures unless --random is given)')
+    parser.add_argument('--first', default='', help='the configuration measured (default: '
+                                                    'ALPHABETA at depth 4)')
+    parser.add_argument('--second', default='', help='the configuration it plays against')
+    parser.add_argument('--random', type=int, default=0, metavar='N',
+                        help='also start games from N generated positions')
+    parser.add_argument('--seed', type=int, default=561, help='seed of the generated positions')
+    parser.add_argument('--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--jsonl', help='write every game to this JSONL file')
+    args = parser.parse_args(argv)
+
+    try:
+        first = parse_config(args.first)
+        second = parse_config(args.second)
+    except ValueError as error:
+        parser.error(str(error))
+
+    inputs = args.inputs
+    if not inputs and not args.random:
+        inputs = [HERE]
+    starts = []
+    for path in expand_inputs(inputs):
+        f = open(path, 'r')
+        to_move, algorithm, depth, rows, score_array = engine.read_input(f)
+        f.close()
+        starts.append((os.path.basename(path), (to_move, rows, score_array)))
+    rng = random.Random(args.seed)
+    for index in range(args.random):
+        to_move, algorithm, depth, rows, score_array = random_position(rng)
+        starts.append(('random{}'.format(index + 1), (to_move, rows, score_array)))
+    if not starts:
+        parser.error('no positions to start games from')
+
+    stream = open(args.jsonl, 'w') if args.jsonl is not None else None
+    games = []
+    started = time.time()
+    pool = multiprocessing.Pool(max(1, args.jobs))
+    try:
+        for game in pool.imap_unordered(play_game, make_tasks(starts, first, second)):
+            games.append(game)
+            if stream is not None:
+                stream.write(json.dumps(game) + '\n')
+                stream.flush()
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        if stream is not None:
+            stream.close()
+    elapsed = time.time() - started
+
+    results = [game['result'] for game in games]
+    wins = results.count(1.0)
+    draws = results.count(0.5)
+    losses = results.count(0.0)
+    score, low, high = score_interval(results)
+    sys.stderr.write('{} games in {:.2f}s: {:.2f} games/s, {:.1f} plies per game\n'.format(
+        len(games), elapsed, len(games) / elapsed if elapsed > 0 else 0.0,
+        float(sum(game['plies'] for game in games)) / len(games)))
+    for player, name in ((0, 'first'), (1, 'second')):
+        nodes = sum(game['nodes'][player] for game in games)
+        seconds = sum(game['search_seconds'][player] for game in games)
+        sys.stderr.write('{}: {} nodes in {:.2f}s of search, {:.0f} nodes/s\n'.format(
+            name, nodes, seconds, nodes / seconds if seconds > 0 else 0.0))
+    sys.stderr.write('first against second: {} wins, {} draws, {} losses\n'.format(
+        wins, draws, losses))
+    sys.stderr.write('score {:.3f} (95% CI {:.3f} to {:.3f}), Elo {:+.0f} ({:+.0f} to {:+.0f})\n'
+                     .format(score, low, high, elo(score), elo(low), elo(high)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
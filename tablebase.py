@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Build an endgame tablebase for hw1cs561s2018.py.
+
+    python tablebase.py --pieces 3 --score-array 10,20,30,40,50,60,70,80 -o endgame.tb
+    python tablebase.py --pieces 3 --input input.txt -o endgame.tb
+    python hw1cs561s2018.py --tablebase endgame.tb
+
+Every position with both sides on the board and at most --pieces pieces
+(stack heights counted) is solved to the end of the game for one
+score_array, and the values are written to a file the engine reads as a
+Tablebase. Positions are solved backwards from the end of the game: a
+move never adds pieces and moves a piece forward, so solving positions
+by increasing piece count, and the most advanced first, finds the value
+of every move's result before the position it is played from.
+"""
+
+import argparse
+import sys
+import time
+
+import hw1cs561s2018 as engine
+
+
+def piece_layouts(max_pieces, squares=engine.BOARD_SIZE * engine.BOARD_SIZE):
+    """Yield every board with both sides on it and at most max_pieces pieces
+    as a tuple of (square, signed count) pairs."""
+
+    def layouts(first, pieces_left, stacks):
+        if stacks and any(count > 0 for square, count in stacks) and any(
+                count < 0 for square, count in stacks):
+            yield tuple(stacks)
+        for square in range(first, squares):
+            for count in range(1, pieces_left + 1):
+                for signed in (count, -count):
+                    stacks.append((square, signed))
+                    for layout in layouts(square + 1, pieces_left - count, stacks):
+                        yield layout
+                    stacks.pop()
+
+    return layouts(0, max_pieces, [])
+
+
+def solving_order(layout):
+    """Sort key that puts every position after the positions its moves lead to."""
+    pieces = 0
+    advanced = 0
+    for square, count in layout:
+        row = square // engine.BOARD_SIZE
+        pieces += abs(count)
+        advanced += abs(count) * (7 - row if count > 0 else row)
+    return pieces, -advanced
+
+
+def build_tablebase(score_array, max_pieces, log=None):
+    """Solve every position with at most max_pieces pieces. Returns a dict
+    from Tablebase.position_key to the Star value of the position."""
+    # Values do not depend on how often a move is generated
+    game = engine.Checkers(distinct_moves=True)
+    weights = engine.parse_weights(score_array)
+    layouts = sorted(piece_layouts(max_pieces), key=solving_order)
+    values = {}
+    started = time.time()
+    for number, layout in enumerate(layouts):
+        board = engine.Board()
+        for square, count in layout:
+            board.counts[square] = count
+            if count > 0:
+                board.star |= 1 << square
+            else:
+                board.circle |= 1 << square
+            board.zobrist ^= engine.ZOBRIST_SQUARE[square][count]
+        board.weights = weights
+        board.score = board.score_under(weights)
+
+        side_values = {}
+        passing = []
+        for to_move in ('Star', 'Circle'):
+            moves = game.move_generator(board, to_move)
+            if moves[0] == 'pass':
+                passing.append(to_move)
+                continue
+            child_to_move = 'Circle' if to_move == 'Star' else 'Star'
+            child_values = []
+            for move in moves:
+                undo = game.apply_move(board, move, to_move)
+                if not board.star or not board.circle:
+                    child_values.append(board.score)
+                else:
+                    child_values.append(
+                        values[engine.Tablebase.position_key(board, child_to_move)])
+                game.undo_move(board, undo)
+            side_values[to_move] = (max if to_move == 'Star' else min)(child_values)
+        # A side that has to pass leaves the same board to the other side;
+        # when neither side can move the game ends
+        for to_move in passing:
+            other = 'Circle' if to_move == 'Star' else 'Star'
+            side_values[to_move] = side_values.get(other, board.score)
+        for to_move, value in side_values.items():
+            values[engine.Tablebase.position_key(board, to_move)] = value
+
+        if log is not None and (number + 1) % 100000 == 0:
+            log.write('{} of {} positions in {:.1f}s\n'.format(number + 1, len(layouts),
+                                                             time.time() - started))
+    return values
+
+
+def write_tablebase(f, values, score_array, max_pieces):
+    """Write values, as built by build_tablebase, in the Tablebase format."""
+    size = 1
+    while size < 2 * len(values):
+        size <<= 1
+    table = bytearray(engine.Tablebase.HEADER.size + size * engine.Tablebase.SLOT.size)
+    engine.Tablebase.HEADER.pack_into(table, 0, engine.Tablebase.MAGIC, engine.Tablebase.VERSION,
+                                      max_pieces, size, len(values),
+                                      *[int(weight) for weight in score_array])
+    slot_size = engine.Tablebase.SLOT.size
+    for key, value in values.items():
+        slot = key % size
+        while engine.Tablebase.SLOT.unpack_from(table, engine.Tablebase.HEADER.size +
+                                                slot * slot_size)[0]:
+            slot = (slot + 1) % size
+        engine.Tablebase.SLOT.pack_into(table, engine.Tablebase.HEADER.size + slot * slot_size,
+                                        key, value)
+    f.write(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build an endgame tablebase.')
+    parser.add_argument('--pieces', type=int, default=3,
+                        help='largest number of pieces on the board (default: %(default)s)')
+    weights = parser.add_mutually_exclusive_group(required=True)
+    weights.add_argument('--score-array', help='the eight comma-separated row weights')
+    weights.add_argument('--input', help='take the score_array of this input.txt file')
+    parser.add_argument('-o', '--output', required=True, help='tablebase file to write')
+    args = parser.parse_args(argv)
+
+    if args.input is not None:
+        f = open(args.input, 'r')
+        score_array = engine.read_input(f)[4]
+        f.close()
+    else:
+        score_array = args.score_array.split(',')
+    if len(score_array) != engine.BOARD_SIZE:
+        parser.error('a score_array has {} weights'.format(engine.BOARD_SIZE))
+
+    started = time.time()
+    values = build_tablebase(score_array, args.pieces, log=sys.stderr)
+    f = open(args.output, 'wb')
+    write_tablebase(f, values, score_array, args.pieces)
+    f.close()
+    sys.stderr.write('solved {} positions in {:.1f}s\n'.format(len(values),
+                                                             time.time() - started))
+
+
+if __name__ == '__main__':
+    main()
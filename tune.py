@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Fit the score_array weights to the outcomes of self-play games.
+
+    python tune.py --input input6.txt --random 200 --save games.npz
+    python tune.py --load games.npz --method local
+    python tune.py --load games.npz --load more.npz --scale 80
+
+Positions come from self-play games (see selfplay.py) started from --random
+generated positions and played with --config on both sides, or from files
+saved with --save earlier. Every position of a game is labelled with its
+outcome for Star (1, 0.5 or 0), judged by the score_array of --input or
+--score-array, and kept as NumPy arrays of the Star and Circle pieces on
+each row. The utility of all positions under a score_array is then one
+matrix product, as in batch_utility, so the fits below evaluate whole
+data sets at a time.
+
+The gradient method fits the weights of a logistic model of the outcome
+by Newton's method. The local method starts from the given score_array
+and moves one weight at a time up or down while that lowers the squared
+error of the predicted outcome, with a step that halves down to 1. Every
+candidate is judged with the k that fits it best, so scaling all weights
+up gains nothing. Both scale the weights to whole numbers up to --scale.
+The weights are printed as a line ready for input.txt; the fit is
+reported on stderr.
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import hw1cs561s2018 as engine
+from benchmark import random_position
+import selfplay
+
+
+def play_games(score_array, config, games, seed, jobs, log=None):
+    """Play games from generated positions, judged by score_array, and
+    return the (stars, circles, results) arrays of their positions."""
+    rng = random.Random(seed)
+    starts = []
+    for index in range((games + 1) // 2):
+        to_move, algorithm, depth, rows, weights = random_position(rng)
+        starts.append(('random{}'.format(index + 1), (to_move, rows, score_array)))
+    counts = []
+    results = []
+    started = time.time()
+    pool = multiprocessing.Pool(max(1, jobs))
+    try:
+        for game in pool.imap_unordered(selfplay.play_game,
+                                        selfplay.make_tasks(starts, config, config, True)):
+            star_result = game['result']
+            if game['first_plays'] == 'Circle':
+                star_result = 1 - star_result
+            counts.extend(game['positions'])
+            results.extend([star_result] * len(game['positions']))
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    if log is not None:
+        log.write('played {} games, {} positions, in {:.1f}s\n'.format(
+            2 * len(starts), len(counts), time.time() - started))
+    signed = numpy.frombuffer(b''.join(counts), dtype=numpy.int8).reshape(
+        -1, engine.BOARD_SIZE, engine.BOARD_SIZE)
+    return (numpy.maximum(signed, 0).sum(axis=2).astype(numpy.int16),
+            numpy.maximum(-signed, 0).sum(axis=2).astype(numpy.int16),
+            numpy.array(results, dtype=numpy.float64))
+
+
+def features(stars, circles):
+    """The (N, 8) matrix whose product with a score_array is the Star
+    utility of each position: Stars score by score_array reversed by row."""
+    return stars[:, ::-1].astype(numpy.float64) - circles
+
+
+def predict(x, weights, k):
+    """The predicted Star outcome of each position: the logistic of its
+    utility divided by k."""
+    return 1.0 / (1.0 + numpy.exp(-x.dot(weights) / k))
+
+
+def squared_error(x, results, weights, k):
+    return float(numpy.mean((predict(x, weights, k) - results) ** 2))
+
+
+def fit_k(x, results, weights):
+    """The k that makes the utilities under weights predict results best,
+    and the squared error with it."""
+    utilities = numpy.abs(x.dot(weights))
+    spread = float(numpy.percentile(utilities, 90)) or 1.0
+    candidates = spread * numpy.logspace(-2, 1, 61)
+    errors = [squared_error(x, results, weights, k) for k in candidates]
+    best = int(numpy.argmin(errors))
+    return float(candidates[best]), errors[best]
+
+
+def fit_gradient(x, results, iterations=25, l2=1e-6):
+    """Logistic regression weights of results on x by Newton's method."""
+    weights = numpy.zeros(x.shape[1])
+    for iteration in range(iterations):
+        p = predict(x, weights, 1.0)
+        gradient = x.T.dot(p - results) / len(results) + l2 * weights
+        hessian = ((x * (p * (1 - p))[:, None]).T.dot(x) / len(results) +
+                   l2 * numpy.eye(len(weights)))
+        step = numpy.linalg.solve(hessian, gradient)
+        weights -= step
+        if numpy.abs(step).max() < 1e-9:
+            break
+    return weights
+
+
+def fit_local(x, results, weights, step=16):
+    """Improve the whole-number weights one at a time, refitting k for
+    every candidate: with k fixed, weights scaled up predict more sharply
+    and seem better without ranking the positions any better."""
+    weights = numpy.array(weights, dtype=numpy.float64)
+    best = fit_k(x, results, weights)[1]
+    while step >= 1:
+        improved = True
+        while improved:
+            improved = False
+            for index in range(len(weights)):
+                for delta in (step, -step):
+                    weights[index] += delta
+                    error = fit_k(x, results, weights)[1]
+                    if error < best:
+                        best = error
+                        improved = True
+                        break
+                    weights[index] -= delta
+        step //= 2
+    return weights.astype(int).tolist()
+
+
+def rescale(weights, scale):
+    """weights as whole numbers, the largest in size being scale."""
+    weights = numpy.asarray(weights, dtype=numpy.float64)
+    largest = numpy.abs(weights).max() or 1.0
+    return [int(round(weight)) for weight in weights * scale / largest]
+
+
+def accuracy(x, results, weights):
+    """Fraction of the decided positions whose utility has the sign of
+    their outcome."""
+    decided = results != 0.5
+    if not decided.any():
+        return 0.0
+    utilities = x[decided].dot(weights)
+    return float(numpy.mean((utilities > 0) == (results[decided] > 0.5)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit the score_array to self-play outcomes.')
+    weights = parser.add_mutually_exclusive_group()
+    weights.add_argument('--score-array',
+                         help='the eight comma-separated row weights that judge the games '
+                              'and start the local search')
+    weights.add_argument('--input', help='take the score_array of this input.txt file')
+    parser.add_argument('--load', action='append', default=[], metavar='NPZ',
+                        help='positions saved with --save (may be repeated)')
+    parser.add_argument('--random', type=int, default=0, metavar='N',
+                        help='play N self-play games from generated positions')
+    parser.add_argument('--config', default='depth=2',
+                        help='selfplay.py configuration of both sides (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=561, help='seed of the generated positions')
+    parser.add_argument('--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes for the games (default: one per CPU)')
+    parser.add_argument('--save', metavar='NPZ', help='save the positions to this file')
+    parser.add_argument('--method', choices=('gradient', 'local'), default='gradient',
+                        help='how to fit the weights (default: %(default)s)')
+    parser.add_argument('--scale', type=int, default=100,
+                        help='largest weight the fit gives (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if numpy is None:
+        parser.error('tune.py needs NumPy')
+    score_array = None
+    if args.input is not None:
+        f = open(args.input, 'r')
+        score_array = engine.read_input(f)[4]
+        f.close()
+    elif args.score_array is not None:
+        score_array = args.score_array.split(',')
+    if score_array is not None:
+        if len(score_array) != engine.BOARD_SIZE:
+            parser.error('a score_array has {} weights'.format(engine.BOARD_SIZE))
+        score_array = [int(weight) for weight in score_array]
+    if not args.load and not args.random:
+        parser.error('give positions with --load or --random')
+    if args.random and score_array is None:
+        parser.error('games are judged by the score_array of --input or --score-array')
+
+    stars, circles, results = [], [], []
+    for path in args.load:
+        data = numpy.load(path)
+        stars.append(data['stars'])
+        circles.append(data['circles'])
+        results.append(data['results'])
+        if score_array is None:
+            score_array = data['score_array'].tolist()
+    if args.random:
+        try:
+            config = selfplay.parse_config(args.config)
+        except ValueError as error:
+            parser.error(str(error))
+        played = play_games([str(weight) for weight in score_array], config, args.random,
+                            args.seed, args.jobs, log=sys.stderr)
+        stars.append(played[0])
+        circles.append(played[1])
+        results.append(played[2])
+    stars = numpy.concatenate(stars)
+    circles = numpy.concatenate(circles)
+    results = numpy.concatenate(results)
+    if not len(results):
+        parser.error('no positions to fit')
+    if args.save is not None:
+        numpy.savez_compressed(args.save, stars=stars, circles=circles, results=results,
+                               score_array=numpy.array(score_array))
+
+    x = features(stars, circles)
+    started = time.time()
+    rounds = 0
+    while time.time() - started < 0.2:
+        x.dot(score_array)
+        rounds += 1
+    sys.stderr.write('{} positions, evaluated at {:.0f} positions/s\n'.format(
+        len(results), rounds * len(results) / (time.time() - started)))
+
+    k, error = fit_k(x, results, score_array)
+    sys.stderr.write('given   {}: squared error {:.5f} (k {:.4g}), sign accuracy {:.3f}\n'.format(
+        ','.join(str(weight) for weight in score_array), error, k,
+        accuracy(x, results, score_array)))
+    if args.method == 'gradient':
+        tuned = rescale(fit_gradient(x, results), args.scale)
+    else:
+        tuned = rescale(fit_local(x, results, rescale(score_array, args.scale)), args.scale)
+    k, error = fit_k(x, results, tuned)
+    sys.stderr.write('tuned   {}: squared error {:.5f} (k {:.4g}), sign accuracy {:.3f}\n'.format(
+        ','.join(str(weight) for weight in tuned), error, k, accuracy(x, results, tuned)))
+    sys.stdout.write(','.join(str(weight) for weight in tuned) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())